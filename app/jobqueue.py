@@ -0,0 +1,476 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Shared job queue with time-bounded leases and pluggable backends
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import logging as log
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Job Queue")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+class Job:
+    """A claimed job: its id, per-job settings and how often it has been claimed."""
+
+    def __init__(self, job_id, config, attempts):
+        self.id = job_id
+        self.config = config
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Job({self.id!r}, attempts={self.attempts})"
+
+
+class QueueBackend:
+    """Interface of a job queue shared by workers on any number of hosts.
+
+    Lease expiry times are wall-clock (`time.time()`) so they compare across hosts.
+    Every call that changes a running job is conditional on the caller still holding
+    its lease, so a worker that lost a lease can never overwrite the new owner's state.
+    """
+
+    def enqueue(self, config, job_id=None, max_attempts=3):
+        """Add a job running with `config` overrides; returns its id."""
+        raise NotImplementedError
+
+    def claim(self, worker, lease_seconds):
+        """Lease the oldest queued job to `worker`; returns a `Job` or None."""
+        raise NotImplementedError
+
+    def renew(self, job_id, worker, lease_seconds, progress=None):
+        """Extend an unexpired lease; returns False if `worker` no longer holds it."""
+        raise NotImplementedError
+
+    def release(self, job_id, worker):
+        """Give a job back to the queue without counting the attempt."""
+        raise NotImplementedError
+
+    def complete(self, job_id, worker, metrics=None):
+        """Mark a leased job done with its metrics; returns False if the lease was lost."""
+        raise NotImplementedError
+
+    def fail(self, job_id, worker, error, metrics=None):
+        """Record a failed attempt, re-queuing the job until its attempts run out."""
+        raise NotImplementedError
+
+    def requeue_expired(self):
+        """Re-queue jobs whose lease expired; returns how many were re-queued."""
+        raise NotImplementedError
+
+    def jobs(self, status=None):
+        """Return all jobs (optionally of one status) as dictionaries."""
+        raise NotImplementedError
+
+
+class SQLiteQueue(QueueBackend):
+    """Queue backend in a single SQLite file.
+
+    Safe for any number of worker threads and processes sharing one local disk.
+    SQLite locking is unreliable on network filesystems, so hosts that do not share
+    a local disk need a networked backend registered with `register_backend()`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            config TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            worker TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            progress INTEGER,
+            metrics TEXT,
+            error TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+    """
+
+    def __init__(self, path):
+        """Open (and create if needed) the queue database at `path`."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Run the block in a write transaction on a fresh connection."""
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _expire(db, now):
+        """Re-queue or fail every running job whose lease expired before `now`."""
+        expired = db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts"
+            " THEN 'failed' ELSE 'queued' END, worker = NULL, lease_expires = NULL,"
+            " error = 'lease expired', updated = ?"
+            " WHERE status = 'running' AND lease_expires < ?",
+            (now, now),
+        )
+        return expired.rowcount
+
+    def enqueue(self, config, job_id=None, max_attempts=3):
+        job_id = job_id or uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (id, config, max_attempts, created, updated)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job_id, json.dumps(config), max_attempts, now, now),
+            )
+        return job_id
+
+    def claim(self, worker, lease_seconds):
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            row = db.execute(
+                "SELECT id, config, attempts FROM jobs WHERE status = 'queued'"
+                " ORDER BY created, rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?,"
+                " attempts = attempts + 1, progress = NULL, updated = ? WHERE id = ?",
+                (worker, now + lease_seconds, now, row["id"]),
+            )
+        return Job(row["id"], json.loads(row["config"]), row["attempts"] + 1)
+
+    def _update_leased(self, job_id, worker, assignments, values, unexpired=False):
+        """Apply `assignments` to a job only while `worker` still holds its lease.
+
+        An expired lease still counts until another worker's claim re-queues the job,
+        unless `unexpired` is set.
+        """
+        now = time.time()
+        query = (
+            f"UPDATE jobs SET {assignments}, updated = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'"
+        )
+        args = (*values, now, job_id, worker)
+        if unexpired:
+            query += " AND lease_expires >= ?"
+            args += (now,)
+        with self._transaction() as db:
+            updated = db.execute(query, args)
+        return updated.rowcount == 1
+
+    def renew(self, job_id, worker, lease_seconds, progress=None):
+        return self._update_leased(
+            job_id,
+            worker,
+            "lease_expires = ?, progress = COALESCE(?, progress)",
+            (time.time() + lease_seconds, progress),
+            unexpired=True,
+        )
+
+    def release(self, job_id, worker):
+        return self._update_leased(
+            job_id,
+            worker,
+            "status = 'queued', worker = NULL, lease_expires = NULL, attempts = attempts - 1",
+            (),
+        )
+
+    def complete(self, job_id, worker, metrics=None):
+        return self._update_leased(
+            job_id,
+            worker,
+            "status = 'done', lease_expires = NULL, metrics = ?, error = NULL",
+            (json.dumps(metrics or {}),),
+        )
+
+    def fail(self, job_id, worker, error, metrics=None):
+        return self._update_leased(
+            job_id,
+            worker,
+            "status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+            " worker = NULL, lease_expires = NULL, metrics = ?, error = ?",
+            (json.dumps(metrics or {}), str(error)),
+        )
+
+    def requeue_expired(self):
+        with self._transaction() as db:
+            return self._expire(db, time.time())
+
+    def jobs(self, status=None):
+        with self._transaction() as db:
+            query = "SELECT * FROM jobs"
+            args = ()
+            if status is not None:
+                query += " WHERE status = ?"
+                args = (status,)
+            rows = db.execute(query + " ORDER BY created, rowid", args).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["config"] = json.loads(job["config"])
+            job["metrics"] = json.loads(job["metrics"]) if job["metrics"] else None
+            jobs.append(job)
+        return jobs
+
+
+def _open_sqlite(url):
+    parsed = urlparse(url)
+    return SQLiteQueue(unquote(parsed.netloc + parsed.path))
+
+
+BACKENDS = {"sqlite": _open_sqlite}
+
+
+def register_backend(scheme, factory):
+    """Register `factory(url)` as the backend for `scheme://` queue URLs."""
+    BACKENDS[scheme] = factory
+
+
+def open_backend(url):
+    """Open the queue backend for `url`, e.g. `sqlite:///app/queue/jobs.db`."""
+    scheme = urlparse(url).scheme
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported queue backend: {scheme or url}")
+    return BACKENDS[scheme](url)
+
+
+class QueueWorker:
+    """Claims jobs from a shared queue and runs them, renewing leases on progress."""
+
+    def __init__(
+        self,
+        backend,
+        job_factory,
+        worker_id=None,
+        lease_seconds=60.0,
+        renew_interval=None,
+        poll_interval=5.0,
+        output_dir="/app/output",
+        max_jobs=0,
+    ):
+        """Initialize the worker; `job_factory(config)` must return a `VideoStreamer`."""
+        self.backend = backend
+        self.job_factory = job_factory
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.renew_interval = renew_interval or lease_seconds / 3
+        self.poll_interval = poll_interval
+        self.output_dir = Path(output_dir)
+        self.max_jobs = max_jobs  # 0 = no limit
+        self.completed = 0
+
+    @classmethod
+    def from_env(cls, job_factory):
+        """Create a worker configured from `QUEUE_*` environment variables."""
+        output_file = Path(os.getenv("OUTPUT_FILE", "/app/output/vidgear_output.mp4"))
+        return cls(
+            open_backend(os.environ["QUEUE_URL"]),
+            job_factory,
+            worker_id=os.getenv("QUEUE_WORKER_ID"),
+            lease_seconds=float(os.getenv("QUEUE_LEASE_SECONDS", "60")),
+            poll_interval=float(os.getenv("QUEUE_POLL_INTERVAL", "5")),
+            output_dir=os.getenv("QUEUE_OUTPUT_DIR", output_file.parent.as_posix()),
+            max_jobs=int(os.getenv("QUEUE_MAX_JOBS", "0")),
+        )
+
+    def job_config(self, job):
+        """Return settings for `job`, with outputs and temporaries unique to the job."""
+        config = dict(job.config)
+        config.setdefault("OUTPUT_FILE", (self.output_dir / f"{job.id}.mp4").as_posix())
+        output_file = Path(config["OUTPUT_FILE"])
+        # temporaries never collide, even if an expired lease is still being worked on
+        suffix = f"{job.id}.{job.attempts}"
+        config.setdefault(
+            "OUTPUT_VIDEO", output_file.with_name(f".{suffix}.video.mp4").as_posix()
+        )
+        config.setdefault(
+            "OUTPUT_AUDIO", output_file.with_name(f".{suffix}.audio.aac").as_posix()
+        )
+        return config
+
+    def _keep_leased(self, job, streamer, done):
+        """Renew the lease until `done`, but only while the streaming loop advances."""
+        last_progress = None
+        stalled = False
+        while not done.wait(self.renew_interval):
+            progress = streamer.frame_count
+            if streamer.phase == "process_stream" and progress == last_progress:
+                if not stalled:
+                    logger.warning(f"⚠️  Job {job.id} stalled at frame {progress}, not renewing")
+                stalled = True
+                continue
+            stalled = False
+            last_progress = progress
+            try:
+                renewed = self.backend.renew(
+                    job.id, self.worker_id, self.lease_seconds, progress
+                )
+            except Exception as e:
+                # e.g. "database is locked" on a busy shared queue: retry on the next tick
+                logger.warning(f"⚠️  Renewing lease on job {job.id} failed: {e}")
+                continue
+            if not renewed:
+                logger.error(f"❌ Lost lease on job {job.id}, cancelling")
+                streamer.cancelled.set()
+                return
+
+    def process(self, job):
+        """Run one claimed job and report its outcome and metrics."""
+        logger.info(f"📥 Claimed job {job.id} (attempt {job.attempts})")
+        config = self.job_config(job)
+        try:
+            streamer = self.job_factory(config)
+        except Exception as e:
+            # bad settings (e.g. an unknown JOB_MODE) fail this job, not the worker
+            error = f"invalid job settings: {e}"
+            metrics = {"worker": self.worker_id, "attempt": job.attempts, "frames": 0}
+            self.backend.fail(job.id, self.worker_id, error, metrics)
+            logger.error(f"❌ Job {job.id} failed: {error}")
+            return False
+        done = threading.Event()
+        keeper = threading.Thread(
+            target=self._keep_leased,
+            args=(job, streamer, done),
+            name="LeaseKeeper",
+            daemon=True,
+        )
+        error = None
+        started = time.perf_counter()
+        keeper.start()
+        try:
+            streamer.run()
+        except SystemExit as e:
+            if e.code in (None, 0):
+                # shutdown signal: hand the job straight back instead of waiting for expiry
+                done.set()
+                self.backend.release(job.id, self.worker_id)
+                logger.info(f"↩️  Released job {job.id} back to the queue")
+                raise
+            error = f"exited with status {e.code}"
+        except Exception as e:
+            error = str(e)
+        finally:
+            done.set()
+            keeper.join()
+
+        seconds = time.perf_counter() - started
+        output_file = Path(config["OUTPUT_FILE"])
+        metrics = {
+            "worker": self.worker_id,
+            "attempt": job.attempts,
+            "frames": streamer.frame_count,
+            "seconds": round(seconds, 3),
+            "fps": round(streamer.frame_count / seconds, 2) if seconds else 0.0,
+            "output_file": output_file.as_posix(),
+            "output_bytes": output_file.stat().st_size if output_file.exists() else 0,
+        }
+        if error is None and not streamer.cancelled.is_set():
+            if not metrics["output_bytes"]:
+                # FFmpeg failures (e.g. a rejected remux) do not raise; retry the attempt
+                error = "no output written"
+            elif self.backend.complete(job.id, self.worker_id, metrics):
+                logger.info(f"✅ Job {job.id} done: {metrics['frames']} frames")
+                return True
+            else:
+                error = "lease lost before completion"
+        self.backend.fail(job.id, self.worker_id, error or "cancelled", metrics)
+        logger.error(f"❌ Job {job.id} failed: {error or 'cancelled'}")
+        return False
+
+    def run(self, stop_event=None):
+        """Claim and run jobs until `stop_event` is set or `max_jobs` ran."""
+        stop_event = stop_event or threading.Event()
+        logger.info(
+            f"👷 Worker {self.worker_id} consuming jobs ({self.lease_seconds:g}s leases)"
+        )
+        while not stop_event.is_set():
+            job = self.backend.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                stop_event.wait(self.poll_interval)
+                continue
+            self.process(job)
+            self.completed += 1
+            if self.max_jobs and self.completed >= self.max_jobs:
+                break
+        logger.info(f"🛑 Worker {self.worker_id} stopping after {self.completed} job(s)")
+
+
+def main(argv=None):
+    """Command-line entry point: `python3 -m app.jobqueue enqueue <url> [KEY=VALUE ...]`."""
+    parser = argparse.ArgumentParser(description="VidGear streamer job queue")
+    parser.add_argument("--queue", default=os.getenv("QUEUE_URL"), help="queue URL")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="add a job")
+    enqueue.add_argument("video_url")
+    enqueue.add_argument("settings", nargs="*", help="KEY=VALUE setting overrides")
+    enqueue.add_argument("--id", help="job id (random if omitted)")
+    enqueue.add_argument("--max-attempts", type=int, default=3)
+    status = commands.add_parser("status", help="list jobs")
+    status.add_argument("--status", choices=["queued", "running", "done", "failed"])
+    commands.add_parser("requeue", help="re-queue jobs with expired leases")
+    args = parser.parse_args(argv)
+    if not args.queue:
+        parser.error("--queue or QUEUE_URL is required")
+
+    backend = open_backend(args.queue)
+    if args.command == "enqueue":
+        config = dict(setting.split("=", 1) for setting in args.settings)
+        config["VIDEO_URL"] = args.video_url
+        print(backend.enqueue(config, job_id=args.id, max_attempts=args.max_attempts))
+    elif args.command == "status":
+        for job in backend.jobs(args.status):
+            details = job["error"] or json.dumps(job["metrics"] or {})
+            print(f"{job['id']}\t{job['status']}\t{job['attempts']}\t{details}")
+    else:
+        print(f"Re-queued {backend.requeue_expired()} job(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Low-latency live capture with a shallow drop-on-lag buffer
+
+import math
+import time
+import threading
+import logging as log
+from collections import deque
+
+import numpy as np
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Live Stream")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+class LiveStream:
+    """CamGear-like stream keeping only the newest `depth` decoded frames.
+
+    `source` must be an *unstarted* CamGear (ideally with `THREADED_QUEUE_MODE`
+    disabled): its capture is read on a dedicated thread instead of CamGear's own,
+    so frames never queue up behind its 96-frame buffer. When the consumer lags,
+    the oldest buffered frame is dropped. Every frame carries the `perf_counter()`
+    time it left the decoder, exposed as `timestamp` after `read()`.
+    """
+
+    def __init__(self, source, depth=2):
+        """Initialize the buffer around `source`, holding at most `depth` frames."""
+        self.source = source
+        self.depth = max(1, depth)
+        self.timestamp = None
+        self.frames = 0
+        self.dropped = 0
+        self.finished = False
+        self._buffer = deque()
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LiveStream", daemon=True)
+
+    @property
+    def framerate(self):
+        return self.source.framerate
+
+    @property
+    def ytv_metadata(self):
+        return self.source.ytv_metadata
+
+    def start(self):
+        """Start the capture thread."""
+        self._thread.start()
+        return self
+
+    def _push(self, frame):
+        with self._ready:
+            if len(self._buffer) >= self.depth:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append((frame, time.perf_counter()))
+            self.frames += 1
+            self._ready.notify()
+
+    def _run(self):
+        try:
+            # CamGear already decoded the first frame while validating the source
+            if self.source.frame is not None:
+                self._push(self.source.frame)
+            capture = self.source.stream
+            while not self._stop.is_set():
+                grabbed, frame = capture.read()
+                if not grabbed:
+                    break
+                self._push(frame)
+        except Exception as e:
+            logger.error(f"❌ Live capture failed: {e}")
+        finally:
+            with self._ready:
+                self.finished = True
+                self._ready.notify_all()
+
+    def read(self):
+        """Return the oldest buffered frame, blocking until one arrives, or None at the end."""
+        with self._ready:
+            while not self._buffer and not self.finished:
+                self._ready.wait()
+            if not self._buffer:
+                return None
+            frame, self.timestamp = self._buffer.popleft()
+            return frame
+
+    def stop(self):
+        """Stop capturing and release the source."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self.source.stop()
+        if not self._thread.is_alive():
+            # never release the capture under a read that is still blocked
+            self.source.stream.release()
+        if self.dropped:
+            logger.warning(
+                f"⚠️  Dropped {self.dropped} of {self.frames} frames to keep up with the source"
+            )
+
+
+class LatencyTracker:
+    """Summarizes per-frame latencies as percentiles in constant memory.
+
+    Latencies are counted in log-spaced buckets (100 per decade, 10 µs to 100 s), so
+    percentiles are accurate to about 1.2% however long the job runs.
+    """
+
+    PERCENTILES = (50, 90, 95, 99)
+    MIN_LATENCY = 1e-5  # seconds; everything below shares the first bucket
+    BUCKETS_PER_DECADE = 100
+    DECADES = 7
+
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS_PER_DECADE * self.DECADES + 1)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, timestamp):
+        """Record the time elapsed since `timestamp` (a `perf_counter()` value)."""
+        self.add(time.perf_counter() - timestamp)
+
+    def add(self, latency):
+        """Count one latency in seconds; values past the last bucket land in it."""
+        self.count += 1
+        self.max = max(self.max, latency)
+        if latency <= self.MIN_LATENCY:
+            index = 0
+        else:
+            index = math.ceil(math.log10(latency / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE)
+        self.counts[min(index, len(self.counts) - 1)] += 1
+
+    def percentiles(self):
+        """Return latency percentiles and the maximum in milliseconds."""
+        if not self.count:
+            return {}
+        cumulative = np.cumsum(self.counts)
+        summary = {}
+        for point in self.PERCENTILES:
+            rank = max(1, math.ceil(point / 100 * self.count))
+            index = int(np.searchsorted(cumulative, rank))
+            # geometric middle of the bucket, never above the largest latency seen
+            value = self.MIN_LATENCY * 10 ** ((index - 0.5) / self.BUCKETS_PER_DECADE)
+            summary[f"p{point}"] = round(min(value, self.max) * 1000, 3)
+        summary["max"] = round(self.max * 1000, 3)
+        return summary
+
+    def report(self):
+        """Log the latency summary."""
+        summary = self.percentiles()
+        if not summary:
+            return
+        logger.info(
+            f"⏱️  Read-to-encoder latency over {self.count} frames: "
+            + ", ".join(f"{name} {value:.1f} ms" for name, value in summary.items())
+        )
@@ -0,0 +1,221 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Multi-source mosaic compositor tiling N streams into one frame
+
+import math
+import time
+import threading
+import logging as log
+
+import cv2
+import numpy as np
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Mosaic Compositor")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+def parse_size(value):
+    """Parse a `WIDTHxHEIGHT` string into a `(width, height)` tuple."""
+    width, height = (int(part) for part in value.lower().split("x"))
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid size: {value}")
+    return width, height
+
+
+def grid_layout(count, layout="auto"):
+    """Return `(columns, rows)` for `count` tiles, from `COLSxROWS` or automatically."""
+    if layout and layout.lower() != "auto":
+        columns, rows = parse_size(layout)
+        if columns * rows < count:
+            raise ValueError(f"Layout {layout} cannot hold {count} sources")
+        return columns, rows
+    columns = math.ceil(math.sqrt(count))
+    return columns, math.ceil(count / columns)
+
+
+class _SourceReader:
+    """Keeps the latest frame of one source, paced at the source framerate."""
+
+    def __init__(self, stream, framerate, name):
+        self.stream = stream
+        self.framerate = framerate
+        self.name = name
+        self.frame = None
+        self.sequence = 0
+        self.finished = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            while True:
+                frame = self.stream.read()
+                if frame is None:
+                    break
+                with self._lock:
+                    self.frame = frame
+                    self.sequence += 1
+                    due = start + self.sequence / self.framerate
+                # live sources block in read(); files would otherwise decode faster than realtime
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        except Exception as e:
+            logger.error(f"❌ Mosaic source {self.name} failed: {e}")
+        finally:
+            # a failed source ends like an exhausted one, so the mosaic never waits on it
+            self.finished = True
+
+    def latest(self):
+        """Return the most recent frame and its sequence number."""
+        with self._lock:
+            return self.frame, self.sequence
+
+    def stop(self):
+        self.stream.stop()
+        self._thread.join(timeout=5)
+
+
+class MosaicStream:
+    """CamGear-like stream that composites several sources into one grid frame.
+
+    Each source is read on its own thread. On every output tick the latest frame of
+    each source is used, so slow sources are repeated and fast ones dropped instead
+    of blocking the grid.
+    """
+
+    def __init__(
+        self,
+        sources,
+        source_factory,
+        tile_size=(640, 360),
+        layout="auto",
+        framerate=30.0,
+    ):
+        """Initialize the compositor; `source_factory(url)` must return a started stream."""
+        if not sources:
+            raise ValueError("Mosaic requires at least one source")
+        self.sources = list(sources)
+        self.source_factory = source_factory
+        self.tile_width, self.tile_height = tile_size
+        self.columns, self.rows = grid_layout(len(self.sources), layout)
+        self.framerate = framerate
+        # preallocated output canvas and per-tile resize targets
+        self.canvas = np.zeros(
+            (self.rows * self.tile_height, self.columns * self.tile_width, 3),
+            dtype=np.uint8,
+        )
+        self._tiles = [
+            np.empty((self.tile_height, self.tile_width, 3), dtype=np.uint8)
+            for _ in self.sources
+        ]
+        self.readers = []
+        self.repeated = [0] * len(self.sources)
+        self.dropped = [0] * len(self.sources)
+        self._sequences = [0] * len(self.sources)
+        self._next_tick = None
+        self.ytv_metadata = {"fps": framerate}
+
+    def start(self):
+        """Open every source; sources that fail to open stay black."""
+        for index, url in enumerate(self.sources):
+            try:
+                stream = self.source_factory(url)
+            except Exception as e:
+                logger.warning(f"⚠️  Mosaic source {index} ({url}) unavailable: {e}")
+                self.readers.append(None)
+                continue
+            metadata = getattr(stream, "ytv_metadata", None) or {}
+            fps = metadata.get("fps") or getattr(stream, "framerate", 0) or self.framerate
+            self.readers.append(
+                _SourceReader(stream, fps, f"MosaicSource-{index}").start()
+            )
+        if not any(self.readers):
+            raise RuntimeError("No mosaic source could be opened")
+        logger.info(
+            f"🧩 Mosaic {self.columns}x{self.rows} @ {self.framerate} FPS, "
+            f"output {self.canvas.shape[1]}x{self.canvas.shape[0]}"
+        )
+        return self
+
+    def _position(self, index):
+        """Return the canvas slice for tile `index`."""
+        y = (index // self.columns) * self.tile_height
+        x = (index % self.columns) * self.tile_width
+        return self.canvas[y : y + self.tile_height, x : x + self.tile_width]
+
+    def _wait_for_tick(self):
+        """Sleep until the next output tick, resyncing if we fell behind."""
+        now = time.perf_counter()
+        if self._next_tick is None or now - self._next_tick > 1 / self.framerate:
+            self._next_tick = now
+        elif self._next_tick > now:
+            time.sleep(self._next_tick - now)
+        self._next_tick += 1 / self.framerate
+
+    def read(self):
+        """Return the composited frame for the next tick, or None when all sources ended."""
+        if all(
+            reader is None
+            or (reader.finished and reader.sequence == self._sequences[index])
+            for index, reader in enumerate(self.readers)
+        ):
+            return None
+        self._wait_for_tick()
+        for index, reader in enumerate(self.readers):
+            if reader is None:
+                continue
+            frame, sequence = reader.latest()
+            last = self._sequences[index]
+            if frame is None or sequence == last:
+                self.repeated[index] += frame is not None
+                continue
+            self.dropped[index] += sequence - last - 1
+            self._sequences[index] = sequence
+            target = self._position(index)
+            if frame.shape == target.shape:
+                target[...] = frame
+                continue
+            tile = self._tiles[index]
+            cv2.resize(
+                frame,
+                (self.tile_width, self.tile_height),
+                dst=tile,
+                interpolation=cv2.INTER_AREA,
+            )
+            target[...] = tile
+        return self.canvas
+
+    def stop(self):
+        """Stop every source and report alignment statistics."""
+        for index, reader in enumerate(self.readers):
+            if reader is None:
+                continue
+            reader.stop()
+            logger.info(
+                f"🧩 Source {index}: {self.repeated[index]} repeated, "
+                f"{self.dropped[index]} dropped frames"
+            )
@@ -0,0 +1,143 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Opt-in sampling profiler and phase timing for streaming jobs
+
+import os
+import sys
+import json
+import time
+import threading
+import logging as log
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Profiler")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+class SamplingProfiler:
+    """Periodically samples the Python stacks of all threads into collapsed-stack counts."""
+
+    def __init__(self, interval=0.01):
+        """Initialize the profiler with a sampling interval in seconds."""
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling on a background daemon thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="SamplingProfiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def _frame_name(frame):
+        """Return a flamegraph-safe label for a stack frame."""
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+    def sample(self):
+        """Record the current stack of every thread except the profiler itself."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}").replace(";", ":"))
+            self.counts[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write(self, path):
+        """Write collapsed stacks (`frame;frame;frame count`) for flamegraph tools."""
+        lines = [f"{stack} {count}" for stack, count in sorted(self.counts.items())]
+        Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class Profiler:
+    """Combines the sampling profiler with wall-clock spans for each job phase."""
+
+    def __init__(self, output_file, interval=0.01):
+        """Initialize the profiler; reports are written next to `output_file`."""
+        output_file = Path(output_file)
+        self.folded_file = output_file.with_name(f"{output_file.stem}.profile.folded")
+        self.spans_file = output_file.with_name(f"{output_file.stem}.profile.json")
+        self.sampler = SamplingProfiler(interval)
+        self.spans = []
+        self._origin = None
+
+    def start(self):
+        """Start the sampler and the span clock."""
+        self._origin = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as a named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append(
+                {
+                    "name": name,
+                    "start": round(start - self._origin, 6),
+                    "duration": round(end - start, 6),
+                }
+            )
+
+    def write(self):
+        """Stop sampling and write the collapsed stacks and phase spans."""
+        self.sampler.stop()
+        self.folded_file.parent.mkdir(parents=True, exist_ok=True)
+        self.sampler.write(self.folded_file)
+        report = {
+            "interval": self.sampler.interval,
+            "samples": self.sampler.samples,
+            "spans": self.spans,
+        }
+        self.spans_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        for span in self.spans:
+            logger.info(f"⏱️  {span['name']}: {span['duration']:.3f}s")
+        logger.info(f"📈 Profile written to: {self.folded_file} and {self.spans_file}")
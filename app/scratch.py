@@ -0,0 +1,258 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Scratch storage for temporary artifacts, with space estimates and preflight
+
+import os
+import uuid
+import fcntl
+import errno
+import atexit
+import shutil
+import socket
+import threading
+import logging as log
+from pathlib import Path
+
+from vidgear.gears.helper import dimensions_to_resolutions, logger_handler
+
+# Initialize logger
+logger = log.getLogger("Scratch Storage")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+# bytes promised per filesystem device, shared by every job in this process
+_reserved = {}
+_reserved_lock = threading.Lock()
+
+
+def _video_bitrate(metadata, quality):
+    """Return the bitrate of the format CamGear streams at `quality`, or None.
+
+    Mirrors CamGear's selection: formats with video, listed worst to best, keyed by
+    resolution (e.g. `720p`); unavailable qualities fall back to `best`.
+    """
+    candidates = [
+        fmt
+        for fmt in metadata.get("formats") or []
+        if fmt.get("vcodec", "none") != "none"
+        and fmt.get("resolution")
+        and fmt.get("protocol") != "http_dash_segments"
+    ]
+    resolutions = dimensions_to_resolutions([fmt["resolution"] for fmt in candidates])
+    matching = [fmt for fmt, res in zip(candidates, resolutions) if res == quality]
+    if matching:
+        selected = matching[-1]
+    elif quality == "worst" and candidates:
+        selected = candidates[0]
+    elif candidates:
+        selected = candidates[-1]
+    else:
+        # no format list: yt-dlp's top-level fields describe its own `best` pick
+        selected = metadata if quality == "best" else {}
+    return selected.get("vbr") or selected.get("tbr") or None
+
+
+def estimate_bytes(metadata, kind="video", duration=None, quality="best"):
+    """Estimate a stream's size as bitrate × duration from yt-dlp metadata, or None.
+
+    `duration` overrides the metadata duration, e.g. when a frame limit cuts the job short.
+    `quality` is the video stream quality (`VIDEO_STREAM_QUALITY`) whose format is sized.
+    """
+    duration = duration or metadata.get("duration")
+    if not duration:
+        return None
+    if kind == "video":
+        rate = _video_bitrate(metadata, quality)
+    else:
+        rate = metadata.get("abr") or None
+    if rate is None and kind == "audio":
+        # combined formats carry no top-level `abr`, the best audio-only format does
+        rates = [
+            fmt.get("abr") or fmt.get("tbr") or 0
+            for fmt in metadata.get("formats") or []
+            if fmt.get("vcodec") == "none" and fmt.get("acodec") not in (None, "none")
+        ]
+        rate = max(rates, default=None) or None
+    if rate is None:
+        return None
+    return int(rate * 1000 / 8 * duration)  # bitrates are in kbit/s
+
+
+def _format_size(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class ScratchSpace:
+    """Places temporaries in a per-job directory on fast local storage when they fit.
+
+    Space promised to temporaries is reserved per filesystem for the whole process,
+    so concurrent jobs (watch and queue workers) do not each count the same free
+    space, and is released again on `cleanup()`.
+
+    The job directory is removed on `cleanup()` or at interpreter exit (so also after
+    `signal_handler` calls `sys.exit()`). While the job runs it holds an exclusive
+    `flock` on a lock file inside the directory; later jobs sweep directories whose
+    lock they can take, i.e. those left behind by processes that died.
+    """
+
+    PREFIX = "vidgear"
+    LOCK_NAME = ".lock"
+
+    def __init__(self, root=None, margin=1.25):
+        """Initialize scratch storage under `root`; without one, nothing is relocated."""
+        self.root = Path(root) if root else None
+        self.margin = margin
+        self.directory = None
+        self._reserved = {}  # bytes this job holds in the process-wide reservations
+        self._lock_fd = None
+
+    def _prefix(self):
+        return f"{self.PREFIX}-{socket.gethostname()}-"
+
+    def sweep_stale(self):
+        """Remove job directories whose lock is free, i.e. whose job no longer runs.
+
+        Host names and pids are not trusted: containers restart with the same
+        hostname and every entrypoint runs as pid 1.
+        """
+        if self.root is None or not self.root.is_dir():
+            return []
+        removed = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or not entry.name.startswith(f"{self.PREFIX}-"):
+                continue
+            try:
+                fd = os.open(entry / self.LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                continue  # removed meanwhile, or not ours to touch
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue  # held by a running job
+            else:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed.append(entry)
+            finally:
+                os.close(fd)
+        if removed:
+            logger.info(f"🧹 Removed {len(removed)} stale scratch dir(s) from {self.root}")
+        return removed
+
+    def _job_directory(self):
+        """Create the per-job directory on first use."""
+        if self.directory is None:
+            name = f"{self._prefix()}{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            staging = self.root / f".{name}"
+            staging.mkdir(parents=True)
+            self._lock_fd = os.open(staging / self.LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            # publish the directory only once locked, so a sweep never sees it unlocked
+            self.directory = staging.rename(self.root / name)
+            atexit.register(self.cleanup)
+        return self.directory
+
+    @staticmethod
+    def _filesystem(path):
+        """Return `(device, existing directory)` for the filesystem `path` will land on."""
+        directory = Path(path).parent
+        while not directory.exists() and directory != directory.parent:
+            directory = directory.parent
+        return directory.stat().st_dev, directory
+
+    def _fits(self, path, size):
+        """Reserve `size` (plus margin) on the filesystem of `path` if it is free."""
+        device, directory = self._filesystem(path)
+        needed = int(size * self.margin)
+        with _reserved_lock:
+            reserved = _reserved.get(device, 0)
+            if shutil.disk_usage(directory).free - reserved < needed:
+                return False
+            _reserved[device] = reserved + needed
+            self._reserved[device] = self._reserved.get(device, 0) + needed
+        return True
+
+    def _release(self):
+        """Hand this job's reservations back to the process."""
+        with _reserved_lock:
+            for device, size in self._reserved.items():
+                remaining = _reserved.get(device, 0) - size
+                if remaining > 0:
+                    _reserved[device] = remaining
+                else:
+                    _reserved.pop(device, None)
+            self._reserved = {}
+
+    def place(self, path, size):
+        """Return where the temporary `path` of estimated `size` bytes should go.
+
+        The scratch location is used only when the estimate is known and fits;
+        otherwise `path` is returned unchanged.
+        """
+        path = Path(path)
+        if self.root is None:
+            return path
+        if size is None:
+            logger.info(f"📦 Size of {path.name} unknown, keeping it in {path.parent}")
+            return path
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not self._fits(self.root / path.name, size):
+            logger.warning(
+                f"⚠️  {path.name} (~{_format_size(size)}) does not fit in {self.root}, "
+                f"keeping it in {path.parent}"
+            )
+            return path
+        placed = self._job_directory() / path.name
+        logger.info(f"📦 Scratch: {path.name} (~{_format_size(size)}) in {placed.parent}")
+        return placed
+
+    def preflight(self, requirements):
+        """Fail fast with ENOSPC if `{path: bytes}` does not fit on its filesystems.
+
+        Requirements on the same filesystem are summed; unknown sizes are skipped.
+        """
+        needed = {}
+        for path, size in requirements.items():
+            if size is None:
+                continue
+            device, directory = self._filesystem(path)
+            total, _ = needed.get(device, (0, directory))
+            needed[device] = (total + int(size * self.margin), directory)
+        for total, directory in needed.values():
+            free = shutil.disk_usage(directory).free
+            if free < total:
+                raise OSError(
+                    errno.ENOSPC,
+                    f"Need ~{_format_size(total)} in {directory}, "
+                    f"only {_format_size(free)} free",
+                )
+            logger.info(
+                f"💽 Preflight: ~{_format_size(total)} needed, "
+                f"{_format_size(free)} free in {directory}"
+            )
+
+    def cleanup(self):
+        """Release reserved space and remove the job directory with everything left in it."""
+        self._release()
+        if self.directory is None:
+            return
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.close(self._lock_fd)  # releases the lock
+        logger.info(f"🗑️  Scratch directory removed: {self.directory}")
+        self.directory = None
+        self._lock_fd = None
+        atexit.unregister(self.cleanup)
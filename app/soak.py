@@ -0,0 +1,472 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Concurrent soak/load harness with a local video server stand-in
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import logging as log
+import multiprocessing as mp
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+from vidgear.gears.helper import logger_handler
+from app.streamer import VideoStreamer
+
+# Initialize logger
+logger = log.getLogger("Soak Harness")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov", ".webm", ".ts"}
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler with single-range `Range` support, as FFmpeg needs for MP4 seeking."""
+
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".mp4": "video/mp4",
+    }
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        self._remaining = None
+        path = self.translate_path(self.path)
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if match is None or not os.path.isfile(path):
+            return super().send_head()
+        size = os.path.getsize(path)
+        first, last = match.groups()
+        if first:
+            start, end = int(first), int(last) if last else size - 1
+        else:
+            start, end = max(0, size - int(last or 0)), size - 1
+        end = min(end, size - 1)
+        if start > end:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return None
+        handle = open(path, "rb")
+        handle.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        self._remaining = end - start + 1
+        return handle
+
+    def copyfile(self, source, outputfile):
+        remaining = self._remaining
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+    def end_headers(self):
+        if not self.headers.get("Range"):
+            self.send_header("Accept-Ranges", "bytes")
+        super().end_headers()
+
+
+def write_playlists(directory, audio=False):
+    """Write an HLS master playlist per video so yt-dlp reports resolution and framerate.
+
+    yt-dlp's generic extractor exposes no resolution for direct file URLs, which
+    CamGear's stream mode requires; a master playlist carries it and points at the file.
+    """
+    playlists = {}
+    for video in sorted(Path(directory).iterdir()):
+        if video.suffix.lower() not in VIDEO_EXTENSIONS:
+            continue
+        capture = cv2.VideoCapture(video.as_posix())
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        capture.release()
+        if not width or not height:
+            logger.warning(f"⚠️  Skipping unreadable video: {video.name}")
+            continue
+        codecs = "avc1.64001f,mp4a.40.2" if audio else "avc1.64001f"
+        playlist = video.with_suffix(".m3u8")
+        playlist.write_text(
+            "#EXTM3U\n"
+            f"#EXT-X-STREAM-INF:BANDWIDTH=2000000,RESOLUTION={width}x{height},"
+            f'FRAME-RATE={fps:.3f},CODECS="{codecs}"\n'
+            f"{video.name}\n",
+            encoding="utf-8",
+        )
+        playlists[video.name] = {"playlist": playlist.name, "fps": fps}
+    return playlists
+
+
+class VideoServer:
+    """Serves a directory of test videos over HTTP on a background thread."""
+
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        handler = partial(RangeRequestHandler, directory=str(directory))
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="VideoServer", daemon=True
+        )
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"🌐 Serving test videos at {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def generate_test_video(path, seconds=30, size="1280x720", fps=30, audio=False):
+    """Render a synthetic test video with FFmpeg's `testsrc2` (and a sine tone if `audio`)."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("FFmpeg is required to generate test videos")
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}:duration={seconds}",
+    ]
+    if audio:
+        command += ["-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}"]
+        command += ["-c:a", "aac"]
+    command += [
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart", str(path),
+    ]
+    subprocess.run(command, check=True)
+    return Path(path)
+
+
+def _process_tree(root):
+    """Return `root` and all of its descendant PIDs."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def process_stats(root):
+    """Return cumulative CPU seconds, RSS bytes and written bytes for a process tree."""
+    cpu = rss = written = 0
+    for pid in _process_tree(root):
+        try:
+            with open(f"/proc/{pid}/stat") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+            # utime, stime, cutime, cstime and rss, offset by the stripped pid/comm
+            cpu += sum(int(value) for value in fields[11:15]) / _CLOCK_TICKS
+            rss += int(fields[21]) * _PAGE_SIZE
+            with open(f"/proc/{pid}/io") as handle:
+                for line in handle:
+                    if line.startswith("write_bytes:"):
+                        written += int(line.split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return cpu, rss, written
+
+
+def _job_main(config, frames, framerate, window):
+    """Child process entry: run one VideoStreamer job, publishing its progress."""
+    streamer = VideoStreamer(config)
+    done = threading.Event()
+    process_stream = streamer.process_stream
+
+    def timed_process_stream():
+        # CLOCK_MONOTONIC is system-wide, so the parent can compare these timestamps
+        window[0] = time.monotonic()
+        try:
+            process_stream()
+        finally:
+            window[1] = time.monotonic()
+
+    def publish():
+        while not done.wait(0.2):
+            frames.value = streamer.frame_count
+            framerate.value = float(streamer.framerate)
+
+    streamer.process_stream = timed_process_stream
+    reporter = threading.Thread(target=publish, daemon=True)
+    reporter.start()
+    try:
+        streamer.run()
+    finally:
+        done.set()
+        frames.value = streamer.frame_count
+        framerate.value = float(streamer.framerate)
+
+
+class _Job:
+    """Parent-side handle on one job process and its sampled metrics."""
+
+    def __init__(self, context, index, config):
+        self.index = index
+        self.frames = context.Value("q", 0)
+        self.framerate = context.Value("d", 0.0)
+        self.window = context.Array("d", 2)  # process_stream() start and end
+        self.process = context.Process(
+            target=_job_main, args=(config, self.frames, self.framerate, self.window)
+        )
+        self.samples = []
+        self._last = None
+
+    def start(self):
+        self.process.start()
+        self.started = time.monotonic()
+        self._last = (self.started, 0, 0.0, 0)
+        return self
+
+    def sample(self):
+        """Record fps, realtime factor, CPU %, RSS and disk throughput since the last sample."""
+        now = time.monotonic()
+        cpu, rss, written = process_stats(self.process.pid)
+        if not rss:
+            return  # process already exited
+        frames = self.frames.value
+        last_time, last_frames, last_cpu, last_written = self._last
+        elapsed = max(now - last_time, 1e-6)
+        fps = (frames - last_frames) / elapsed
+        source_fps = self.framerate.value or 0
+        self.samples.append(
+            {
+                "t": round(now - self.started, 3),
+                "frames": frames,
+                "fps": round(fps, 2),
+                "realtime": round(fps / source_fps, 3) if source_fps else None,
+                "cpu_percent": round(max(cpu - last_cpu, 0) / elapsed * 100, 1),
+                "rss_mb": round(rss / 2**20, 1),
+                "write_mbps": round(max(written - last_written, 0) / elapsed / 2**20, 2),
+            }
+        )
+        self._last = (now, frames, max(cpu, last_cpu), max(written, last_written))
+
+    def summary(self):
+        """Summarize the job; fps covers the streaming loop, excluding setup and finalize."""
+        start, end = self.window[:]
+        processing = max(end - start, 1e-6) if end else 0
+        fps = self.frames.value / processing if processing else 0.0
+        source_fps = self.framerate.value or 0
+        return {
+            "job": self.index,
+            "exit_code": self.process.exitcode,
+            "frames": self.frames.value,
+            "seconds": round(self.finished - self.started, 2),
+            "processing_seconds": round(processing, 2),
+            "fps": round(fps, 2),
+            "realtime": round(fps / source_fps, 3) if source_fps else None,
+            "cpu_percent": round(
+                statistics.fmean([s["cpu_percent"] for s in self.samples] or [0]), 1
+            ),
+            "peak_rss_mb": max([s["rss_mb"] for s in self.samples] or [0]),
+            "write_mbps": round(
+                statistics.fmean([s["write_mbps"] for s in self.samples] or [0]), 2
+            ),
+            "samples": self.samples,
+        }
+
+
+def run_level(concurrency, urls, output_dir, frame_limit, interval, extra_config=None):
+    """Run `concurrency` jobs at once until all exit; return per-job and aggregate metrics."""
+    context = mp.get_context("spawn")
+    level_dir = Path(output_dir) / f"level_{concurrency:03d}"
+    level_dir.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for index in range(concurrency):
+        config = {
+            **(extra_config or {}),
+            "VIDEO_URL": urls[index % len(urls)],
+            "OUTPUT_FILE": (level_dir / f"job_{index:03d}.mp4").as_posix(),
+            "OUTPUT_VIDEO": (level_dir / f".job_{index:03d}.video.mp4").as_posix(),
+            "OUTPUT_AUDIO": (level_dir / f".job_{index:03d}.audio.aac").as_posix(),
+            "FRAME_LIMIT": str(frame_limit),
+        }
+        jobs.append(_Job(context, index, config))
+    for job in jobs:
+        job.start()
+    running = list(jobs)
+    while running:
+        time.sleep(interval)
+        for job in list(running):
+            job.sample()
+            if not job.process.is_alive():
+                job.process.join()
+                job.finished = time.monotonic()
+                running.remove(job)
+    summaries = [job.summary() for job in jobs]
+    shutil.rmtree(level_dir, ignore_errors=True)
+    realtimes = [s["realtime"] for s in summaries if s["realtime"] is not None]
+    return {
+        "concurrency": concurrency,
+        "failed": sum(1 for s in summaries if s["exit_code"] != 0),
+        "aggregate_fps": round(sum(s["fps"] for s in summaries), 2),
+        "median_fps": round(statistics.median(s["fps"] for s in summaries), 2),
+        "median_realtime": round(statistics.median(realtimes), 3) if realtimes else None,
+        "cpu_percent": round(sum(s["cpu_percent"] for s in summaries), 1),
+        "rss_mb": round(sum(s["peak_rss_mb"] for s in summaries), 1),
+        "write_mbps": round(sum(s["write_mbps"] for s in summaries), 2),
+        "jobs": summaries,
+    }
+
+
+def find_saturation(levels, min_gain=0.1, min_realtime=1.0):
+    """Return the highest sustainable concurrency before throughput collapses.
+
+    A level is sustainable when no job failed, its median realtime factor is at least
+    `min_realtime`, and its aggregate fps gained at least `min_gain` (relative) over
+    the previous sustainable level.
+    """
+    saturation = None
+    previous = None
+    for level in sorted(levels, key=lambda level: level["concurrency"]):
+        realtime = level["median_realtime"]
+        if level["failed"] or (realtime is not None and realtime < min_realtime):
+            break
+        if previous is not None and level["aggregate_fps"] < previous * (1 + min_gain):
+            break
+        saturation = level["concurrency"]
+        previous = level["aggregate_fps"]
+    return saturation
+
+
+def format_table(levels, saturation):
+    """Render level results as a plain-text table."""
+    header = (
+        f"{'jobs':>5} {'failed':>6} {'agg fps':>9} {'med fps':>8} {'realtime':>9} "
+        f"{'cpu %':>7} {'rss MB':>8} {'disk MB/s':>10}"
+    )
+    rows = [header, "-" * len(header)]
+    for level in levels:
+        realtime = level["median_realtime"]
+        marker = "  <- saturation" if level["concurrency"] == saturation else ""
+        rows.append(
+            f"{level['concurrency']:>5} {level['failed']:>6} {level['aggregate_fps']:>9.1f} "
+            f"{level['median_fps']:>8.1f} "
+            f"{'n/a' if realtime is None else f'{realtime:.2f}x':>9} "
+            f"{level['cpu_percent']:>7.1f} {level['rss_mb']:>8.1f} "
+            f"{level['write_mbps']:>10.2f}{marker}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv=None):
+    """Command-line entry point: `python3 -m app.soak --levels 1,2,4,8`."""
+    parser = argparse.ArgumentParser(description="VidGear streamer soak/load harness")
+    parser.add_argument("--videos", help="directory of test videos (generated if omitted)")
+    parser.add_argument("--levels", default="1,2,4,8", help="comma-separated concurrency ramp")
+    parser.add_argument("--frame-limit", type=int, default=900, help="frames per job")
+    parser.add_argument("--interval", type=float, default=1.0, help="sampling interval (s)")
+    parser.add_argument("--output-dir", default=tempfile.gettempdir() + "/vidgear-soak")
+    parser.add_argument("--json", help="report path (default: <output-dir>/soak_report.json)")
+    parser.add_argument("--min-gain", type=float, default=0.1)
+    parser.add_argument("--min-realtime", type=float, default=1.0)
+    parser.add_argument("--seconds", type=int, default=60, help="generated video length")
+    parser.add_argument("--size", default="1280x720", help="generated video size")
+    parser.add_argument("--audio", action="store_true", help="test videos carry audio")
+    args = parser.parse_args(argv)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    videos = Path(args.videos) if args.videos else output_dir / "videos"
+    if not args.videos:
+        videos.mkdir(exist_ok=True)
+        clip = videos / f"testsrc_{args.size}.mp4"
+        if not clip.exists():
+            logger.info(f"🎬 Generating {args.seconds}s test video: {clip}")
+            generate_test_video(clip, args.seconds, args.size, audio=args.audio)
+
+    playlists = write_playlists(videos, audio=args.audio)
+    if not playlists:
+        logger.error(f"❌ No usable videos found in {videos}")
+        return 1
+    server = VideoServer(videos).start()
+    urls = [f"{server.base_url}/{entry['playlist']}" for entry in playlists.values()]
+    # stand-in playlists have no audio-only renditions
+    extra_config = {"AUDIO_STREAM_QUALITY": "bestaudio/best"}
+
+    levels = []
+    try:
+        for concurrency in (int(value) for value in args.levels.split(",")):
+            logger.info(f"🚀 Running {concurrency} concurrent job(s)...")
+            level = run_level(
+                concurrency, urls, output_dir, args.frame_limit, args.interval, extra_config
+            )
+            levels.append(level)
+            logger.info(
+                f"📊 {concurrency} job(s): {level['aggregate_fps']} fps total, "
+                f"median realtime {level['median_realtime']}"
+            )
+    finally:
+        server.stop()
+
+    saturation = find_saturation(levels, args.min_gain, args.min_realtime)
+    report = {
+        "urls": urls,
+        "frame_limit": args.frame_limit,
+        "saturation_point": saturation,
+        "levels": levels,
+    }
+    report_file = Path(args.json) if args.json else output_dir / "soak_report.json"
+    report_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_table(levels, saturation))
+    logger.info(f"📝 Report written to: {report_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
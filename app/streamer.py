@@ -18,13 +18,25 @@ limitations under the License.
 
 import os
 import sys
+import errno
 import signal
+import threading
 import logging as log
 import shutil
+from contextlib import nullcontext
 from pathlib import Path
+from urllib.parse import unquote, urlparse
 from yt_dlp import YoutubeDL
 from vidgear.gears import CamGear, WriteGear
 from vidgear.gears.helper import logger_handler
+from app.jobqueue import QueueWorker
+from app.live import LatencyTracker, LiveStream
+from app.mosaic import MosaicStream, parse_size
+from app.profiling import Profiler
+from app.scratch import ScratchSpace, estimate_bytes
+from app.thumbnails import ThumbnailGenerator
+from app.transforms import ColorAdjust, Crop, FrameBatchStage, Resize, Watermark
+from app.watch import DirectoryWatcher
 
 # Initialize logger
 logger = log.getLogger("Video Streamer")
@@ -32,38 +44,136 @@ logger.propagate = False
 logger.addHandler(logger_handler())
 logger.setLevel(log.DEBUG)
 
+JOB_MODES = ("audio-video", "audio-only", "video-only")
+
+# FFmpeg encoders for `AUDIO_CODEC` names; other values are passed through as-is
+AUDIO_ENCODERS = {
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "vorbis": "libvorbis",
+}
+
 
 class VideoStreamer:
     """Handles Video streaming and video writing with audio support."""
 
-    def __init__(self):
-        """Initialize the streamer with environment variables."""
-        self.source_url = os.getenv("VIDEO_URL", "https://youtu.be/xvFZjo5PgG0")
-        self.output_file = Path(os.getenv("OUTPUT_FILE", "/app/output/vidgear_output.mp4"))
-        self.video_stream_quality = os.getenv("VIDEO_STREAM_QUALITY", "best")
-        self.audio_stream_quality = os.getenv("AUDIO_STREAM_QUALITY", "bestaudio")
-        self.output_codec = os.getenv("OUTPUT_CODEC", "libx264")
-        self.audio_codec = os.getenv("AUDIO_CODEC", "aac")
-        self.frame_limit = int(os.getenv("FRAME_LIMIT", "0"))  # 0 = no limit
-        self.output_video = Path(os.getenv("OUTPUT_VIDEO", "/app/output/vidgear_video.mp4"))
-        self.output_audio = Path(os.getenv("OUTPUT_AUDIO", "/app/output/vidgear_audio.aac"))
-        self.verbose = os.getenv("VERBOSE", "false").lower() == "true"
+    def __init__(self, config=None):
+        """Initialize the streamer with environment variables, overridden by `config` if given."""
+        settings = {**os.environ, **(config or {})}
+        self.source_url = settings.get("VIDEO_URL", "https://youtu.be/xvFZjo5PgG0")
+        self.output_file = Path(settings.get("OUTPUT_FILE", "/app/output/vidgear_output.mp4"))
+        self.video_stream_quality = settings.get("VIDEO_STREAM_QUALITY", "best")
+        self.audio_stream_quality = settings.get("AUDIO_STREAM_QUALITY", "bestaudio")
+        self.output_codec = settings.get("OUTPUT_CODEC", "libx264")
+        self.audio_codec = settings.get("AUDIO_CODEC", "aac")
+        self.job_mode = settings.get("JOB_MODE", "audio-video").lower()
+        if self.job_mode not in JOB_MODES:
+            raise ValueError(f"Unsupported JOB_MODE: {self.job_mode}")
+        self.frame_limit = int(settings.get("FRAME_LIMIT", "0"))  # 0 = no limit
+        self.output_video = Path(settings.get("OUTPUT_VIDEO", "/app/output/vidgear_video.mp4"))
+        self.output_audio = Path(settings.get("OUTPUT_AUDIO", "/app/output/vidgear_audio.aac"))
+        self.verbose = settings.get("VERBOSE", "false").lower() == "true"
+        self.live_mode = settings.get("LIVE_MODE", "false").lower() == "true"
+        self.live_buffer = int(settings.get("LIVE_BUFFER", "2"))
+        self.live_gop_seconds = float(settings.get("LIVE_GOP_SECONDS", "1"))
+        self.live_preset = settings.get("LIVE_PRESET", "veryfast")
+        # live output is always flushed incrementally as fragmented MP4
+        self.progressive_output = (
+            settings.get("PROGRESSIVE_OUTPUT", "false").lower() == "true" or self.live_mode
+        )
+        if self.progressive_output:
+            # write fragmented MP4 next to the final file, renamed atomically on completion
+            self.output_video = self.output_file.with_name(
+                f"{self.output_file.stem}.part{self.output_file.suffix}"
+            )
+        self.thumbnails = settings.get("THUMBNAILS", "false").lower() == "true"
+        self.thumbnail_interval = float(settings.get("THUMBNAIL_INTERVAL", "10"))
+        self.thumbnail_width = int(settings.get("THUMBNAIL_WIDTH", "160"))
+        self.sprite_columns = int(settings.get("SPRITE_COLUMNS", "10"))
+        self.sprite_rows = int(settings.get("SPRITE_ROWS", "10"))
+        self.mosaic_urls = [
+            url.strip() for url in settings.get("MOSAIC_URLS", "").split(",") if url.strip()
+        ]
+        self.mosaic_layout = settings.get("MOSAIC_LAYOUT", "auto")
+        self.mosaic_tile_size = parse_size(settings.get("MOSAIC_TILE_SIZE", "640x360"))
+        self.mosaic_framerate = float(settings.get("MOSAIC_FPS", "30"))
+        self.profile = settings.get("PROFILE", "false").lower() == "true"
+        self.profile_interval = float(settings.get("PROFILE_INTERVAL_MS", "10")) / 1000
+        self.transform_crop = settings.get("TRANSFORM_CROP", "")
+        self.transform_resize = settings.get("TRANSFORM_RESIZE", "")
+        self.transform_brightness = float(settings.get("TRANSFORM_BRIGHTNESS", "0"))
+        self.transform_contrast = float(settings.get("TRANSFORM_CONTRAST", "1"))
+        self.transform_gamma = float(settings.get("TRANSFORM_GAMMA", "1"))
+        self.transform_watermark = settings.get("TRANSFORM_WATERMARK", "")
+        self.transform_watermark_position = settings.get(
+            "TRANSFORM_WATERMARK_POSITION", "10,10"
+        )
+        self.transform_watermark_opacity = float(
+            settings.get("TRANSFORM_WATERMARK_OPACITY", "1")
+        )
+        self.transform_batch = int(settings.get("TRANSFORM_BATCH", "8"))
+        self.transform_workers = int(settings.get("TRANSFORM_WORKERS", "0"))
+        if self.live_mode:
+            # every frame goes to the encoder as soon as it is transformed
+            self.transform_batch = 1
+        self.scratch_dir = settings.get("SCRATCH_DIR", "")
+        self.scratch_margin = float(settings.get("SCRATCH_MARGIN", "1.25"))
+        # estimates can be rough, so only check space by default when scratch is in use
+        self.scratch_preflight = (
+            settings.get("SCRATCH_PREFLIGHT", "true" if self.scratch_dir else "false").lower()
+            == "true"
+        )
+        self.local_source = self._local_path(self.source_url)
         self.stream = None
         self.writer = None
+        self.thumbnailer = None
+        self.transform_stage = None
+        self.profiler = None
+        self.latency = None
+        self.audio_metadata = None  # yt-dlp info of audio-only jobs
+        self.scratch = ScratchSpace(self.scratch_dir, self.scratch_margin)
+        self.phase = None
+        self.cancelled = threading.Event()
         self.frame_count = 0
         self.framerate = 30  # Default framerate
 
+    @staticmethod
+    def _local_path(source):
+        """Return the local file behind `source` (plain path or `file://` URL), else None."""
+        parsed = urlparse(source)
+        if parsed.scheme == "file":
+            path = Path(unquote(parsed.path))
+        elif parsed.scheme == "":
+            path = Path(source)
+        else:
+            return None
+        return path if path.is_file() else None
+
+    def _audio_input(self):
+        """Return the audio input to mux with the video, or None if there is none."""
+        if self.job_mode == "video-only":
+            return None
+        if self.local_source is not None:
+            return self.local_source
+        if self.output_audio.exists():
+            return self.output_audio
+        return None
+
     def _has_audio(self):
         """Check if the source has available audio formats."""
         try:
             logger.info("🔍 Checking for available audio formats...")
-            with YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
-                info = ydl.extract_info(self.source_url, download=False)
-                formats = info.get("formats", [])
-                for fmt in formats:
-                    if fmt.get("audio_ext") not in [None, "none"]:
-                        logger.info("✅ Audio format found in source")
-                        return True
+            # CamGear already extracted every format while opening the stream
+            metadata = getattr(self.stream, "ytv_metadata", None) or {}
+            formats = metadata.get("formats")
+            if formats is None:
+                with YoutubeDL({"quiet": True, "no_warnings": True}) as ydl:
+                    info = ydl.extract_info(self.source_url, download=False)
+                    formats = info.get("formats", [])
+            for fmt in formats:
+                if fmt.get("audio_ext") not in [None, "none"]:
+                    logger.info("✅ Audio format found in source")
+                    return True
             return False
         except Exception as e:
             logger.warning(f"⚠️  Could not check for audio formats: {e}")
@@ -71,6 +181,18 @@ class VideoStreamer:
 
     def download_audio(self):
         """Download audio stream using yt-dlp if available."""
+        if self.job_mode == "video-only":
+            logger.info("🎧 Video-only job, skipping audio download")
+            return
+        if self.mosaic_urls:
+            logger.info("🎧 Mosaic output has no audio track, skipping audio download")
+            return
+        if self.live_mode:
+            logger.info("🎧 Live mode records video only, skipping audio download")
+            return
+        if self.local_source is not None:
+            logger.info("🎧 Local source, audio will be muxed directly from the input file")
+            return
         if not self._has_audio():
             logger.info("🎧 No audio format available, skipping audio download")
             return
@@ -84,8 +206,36 @@ class VideoStreamer:
         with YoutubeDL(ydl_opts) as ydl:
             ydl.download([self.source_url])
 
+    def _open_source(self, url):
+        """Open and start a CamGear stream for a single mosaic source."""
+        return CamGear(
+            source=url,
+            stream_mode=True,
+            logging=self.verbose,
+            STREAM_RESOLUTION=self.video_stream_quality,
+        ).start()
+
+    def setup_mosaic(self):
+        """Initialize a mosaic of all `MOSAIC_URLS` sources as the input stream."""
+        logger.info(f"🧩 Initializing mosaic from {len(self.mosaic_urls)} sources")
+        try:
+            self.stream = MosaicStream(
+                self.mosaic_urls,
+                self._open_source,
+                tile_size=self.mosaic_tile_size,
+                layout=self.mosaic_layout,
+                framerate=self.mosaic_framerate,
+            ).start()
+            logger.info("✅ Mosaic initialized successfully")
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize mosaic: {e}")
+            raise
+        self.framerate = self.mosaic_framerate
+
     def setup_stream(self):
         """Initialize CamGear for Video streaming with audio."""
+        if self.mosaic_urls:
+            return self.setup_mosaic()
         logger.info(f"🌐 Initializing stream from: {self.source_url}")
         logger.info(f"📊 Stream quality: {self.video_stream_quality}")
 
@@ -93,13 +243,29 @@ class VideoStreamer:
         stream_options = {
             "STREAM_RESOLUTION": self.video_stream_quality,
         }
+        if self.local_source is not None:
+            # local files are decoded directly, without yt-dlp extraction
+            stream_options = {}
+        if self.live_mode:
+            # frames are buffered by LiveStream instead of CamGear's deep queue
+            stream_options["THREADED_QUEUE_MODE"] = False
         try:
-            self.stream = CamGear(
-                source=self.source_url,
-                stream_mode=True,
+            source = CamGear(
+                source=(
+                    self.source_url
+                    if self.local_source is None
+                    else self.local_source.as_posix()
+                ),
+                stream_mode=self.local_source is None,
                 logging=self.verbose,
                 **stream_options,
-            ).start()
+            )
+            if self.live_mode:
+                logger.info(f"⚡ Live mode, buffering at most {self.live_buffer} frame(s)")
+                self.stream = LiveStream(source, self.live_buffer).start()
+                self.latency = LatencyTracker()
+            else:
+                self.stream = source.start()
             logger.info("✅ Stream initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize stream: {e}")
@@ -107,9 +273,58 @@ class VideoStreamer:
         # get Video's metadata as JSON object
         video_metadata = self.stream.ytv_metadata
         _framerate = video_metadata.get("fps", None)
+        if self.local_source is not None:
+            _framerate = self.stream.framerate or None
         self.framerate = _framerate if _framerate is not None else 30
         logger.info(f"🎞️  Video framerate detected: {self.framerate} FPS")
 
+    def setup_scratch(self):
+        """Place temporaries on scratch storage when they fit, then preflight free space."""
+        audio_only = self.job_mode == "audio-only"
+        downloads_audio = (
+            self.job_mode != "video-only"
+            and not self.mosaic_urls
+            and not self.live_mode
+            and self.local_source is None
+        )
+        if audio_only:
+            metadata = self.audio_metadata or {}
+        else:
+            metadata = getattr(self.stream, "ytv_metadata", None) or {}
+        duration = metadata.get("duration")
+        if self.frame_limit > 0 and not audio_only:
+            limit = self.frame_limit / self.framerate
+            duration = min(duration, limit) if duration else limit
+        if audio_only:
+            video_size = None
+        elif self.local_source is not None:
+            # the re-encode is assumed to be no larger than the source file
+            video_size = self.local_source.stat().st_size
+        else:
+            video_size = estimate_bytes(
+                metadata, "video", duration, self.video_stream_quality.strip().lower()
+            )
+        audio_size = estimate_bytes(metadata, "audio", duration) if downloads_audio else None
+
+        self.scratch.sweep_stale()
+        if not self.progressive_output and not audio_only:
+            # progressive output must stay next to the final file to be renamed into place
+            self.output_video = self.scratch.place(self.output_video, video_size)
+        if downloads_audio:
+            self.output_audio = self.scratch.place(self.output_audio, audio_size)
+
+        if not self.scratch_preflight:
+            return
+        requirements = {} if audio_only else {self.output_video: video_size}
+        if downloads_audio:
+            requirements[self.output_audio] = audio_size
+        if audio_only:
+            # the encode is assumed to be no larger than the downloaded audio
+            requirements[self.output_file] = audio_size
+        elif not self.progressive_output and video_size is not None:
+            requirements[self.output_file] = video_size + (audio_size or 0)
+        self.scratch.preflight(requirements)
+
     def setup_writer(self):
         """Initialize WriteGear for video writing with audio support."""
         logger.info(f"📝 Setting up video writer: {self.output_video}")
@@ -124,6 +339,35 @@ class VideoStreamer:
             "-input_framerate": self.framerate,
             "-c:v": self.output_codec,
         }
+        if self.progressive_output:
+            audio_input = self._audio_input()
+            if audio_input is not None:
+                # mux the already downloaded audio live instead of remuxing afterwards
+                output_params.update(
+                    {
+                        "-i": audio_input.as_posix(),
+                        "-c:a": "copy",
+                        "-clones": ["-map", "0:v:0", "-map", "1:a:0?", "-shortest"],
+                        "-disable_force_termination": True,
+                    }
+                )
+            # fragmented MP4 is playable while writing and needs no finalize pass;
+            # it must follow the audio `-i`, or FFmpeg applies it to that input
+            output_params["-movflags"] = "+frag_keyframe+empty_moov+default_base_moof"
+            logger.info(f"📡 Progressive output, tail {self.output_video} while writing")
+        if self.live_mode:
+            gop = max(1, round(self.framerate * self.live_gop_seconds))
+            output_params.update(
+                {
+                    "-preset": self.live_preset,
+                    "-tune": "zerolatency",
+                    "-g": gop,
+                    "-keyint_min": gop,
+                    "-sc_threshold": 0,
+                    "-flush_packets": 1,
+                }
+            )
+            logger.info(f"⚡ Zero-latency encoding, keyframe every {gop} frames")
 
         try:
             self.writer = WriteGear(
@@ -137,6 +381,69 @@ class VideoStreamer:
             logger.error(f"❌ Failed to initialize writer: {e}")
             raise
 
+    def setup_transforms(self):
+        """Build the batched frame-transform stage from `TRANSFORM_*` settings."""
+        transforms = []
+        if self.transform_crop:
+            x, y, width, height = (int(v) for v in self.transform_crop.split(","))
+            transforms.append(Crop(x, y, width, height))
+        if self.transform_resize:
+            transforms.append(Resize(*parse_size(self.transform_resize)))
+        color = (self.transform_brightness, self.transform_contrast, self.transform_gamma)
+        if color != (0, 1, 1):
+            transforms.append(ColorAdjust(*color))
+        if self.transform_watermark:
+            x, y = (int(v) for v in self.transform_watermark_position.split(","))
+            transforms.append(
+                Watermark.from_file(
+                    self.transform_watermark, x, y, self.transform_watermark_opacity
+                )
+            )
+        if not transforms:
+            return
+        logger.info(
+            f"🎛️  Frame transforms: {', '.join(type(t).__name__ for t in transforms)} "
+            f"(batch {self.transform_batch}, workers {self.transform_workers})"
+        )
+        self.transform_stage = FrameBatchStage(
+            transforms, self.transform_batch, self.transform_workers
+        )
+
+    def setup_thumbnails(self):
+        """Start the background poster and sprite-sheet generator if enabled."""
+        if not self.thumbnails:
+            return
+        logger.info(
+            f"🖼️  Sampling thumbnails every {self.thumbnail_interval}s "
+            f"({self.sprite_columns}x{self.sprite_rows} tiles per sprite sheet)"
+        )
+        self.thumbnailer = ThumbnailGenerator(
+            self.output_file,
+            self.framerate,
+            interval=self.thumbnail_interval,
+            tile_width=self.thumbnail_width,
+            columns=self.sprite_columns,
+            rows=self.sprite_rows,
+        ).start()
+
+    def _write_frame(self, frame):
+        """Write a single frame and hand it over to the thumbnail worker."""
+        self.writer.write(frame)
+        if self.thumbnailer is not None:
+            self.thumbnailer.submit(frame)
+
+    def _write_batch(self, batch):
+        """Write every frame of a transformed batch, if one is ready."""
+        if batch is None:
+            return
+        for frame in batch:
+            self._write_frame(frame)
+
+    def _flush_transforms(self):
+        """Write frames still pending in a partially filled transform batch."""
+        if self.transform_stage is not None:
+            self._write_batch(self.transform_stage.flush())
+
     def process_stream(self):
         """Main processing loop: read frames from stream and write to output."""
         logger.info("🎬 Starting video processing...")
@@ -149,13 +456,22 @@ class VideoStreamer:
                 # Read frame from stream
                 frame = self.stream.read()
 
+                # Stop when the job was cancelled from another thread
+                if self.cancelled.is_set():
+                    raise RuntimeError("Job cancelled")
+
                 # Check if frame is None (stream ended)
                 if frame is None:
                     logger.info("🏁 Stream ended or no more frames available")
                     break
 
-                # Write frame to output
-                self.writer.write(frame)
+                # Transform in batches, or write frame to output directly
+                if self.transform_stage is None:
+                    self._write_frame(frame)
+                else:
+                    self._write_batch(self.transform_stage.push(frame))
+                if self.latency is not None:
+                    self.latency.record(self.stream.timestamp)
                 self.frame_count += 1
 
                 # Progress indicator
@@ -167,18 +483,45 @@ class VideoStreamer:
                     logger.info(f"🎯 Reached frame limit of {self.frame_limit}")
                     break
 
+            self._flush_transforms()
         except KeyboardInterrupt:
             logger.info("\n⚠️  Keyboard interrupt received, stopping gracefully...")
+            self._flush_transforms()
         except Exception as e:
             logger.error(f"❌ Error during processing: {e}")
             raise
         finally:
             logger.info(f"✅ Total frames processed: {self.frame_count}")
+            if self.latency is not None:
+                self.latency.report()
+
+    @staticmethod
+    def _move_output(source, destination):
+        """Rename `source` to `destination`, copying only across filesystems."""
+        try:
+            os.replace(source, destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copy2(source, destination)
 
     def combine_audio_video(self):
-        """Combine audio and video into final output file, or copy video if no audio."""
+        """Combine audio and video into final output file, or move video if no audio."""
         logger.info("🔊 Finalizing output...")
-        if self.output_audio.exists():
+        if self.thumbnailer is not None:
+            try:
+                self.thumbnailer.write()
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to write thumbnails: {e}")
+        if self.progressive_output:
+            logger.info("🔊 Progressive output already complete, renaming into place...")
+            try:
+                os.replace(self.output_video, self.output_file)
+                logger.info(f"✅ Final output saved to: {self.output_file}")
+            except Exception as e:
+                logger.error(f"❌ Failed to rename progressive output: {e}")
+                raise
+        elif self._audio_input() is not None:
             logger.info("🔊 Audio available, combining audio and video...")
             try:
                 # format FFmpeg command to generate `Output_with_audio.mp4` by merging input_audio in above rendered `Output.mp4`
@@ -187,7 +530,7 @@ class VideoStreamer:
                     "-i",
                     self.output_video.as_posix(),
                     "-i",
-                    self.output_audio.as_posix(),
+                    self._audio_input().as_posix(),
                     "-c:v",
                     "copy",
                     "-c:a",
@@ -195,7 +538,7 @@ class VideoStreamer:
                     "-map",
                     "0:v:0",
                     "-map",
-                    "1:a:0",
+                    "1:a:0?",
                     "-shortest",
                     self.output_file.as_posix(),
                 ]  # `-y` parameter is to overwrite outputfile if exists
@@ -207,9 +550,9 @@ class VideoStreamer:
                 logger.error(f"❌ Failed to combine audio and video: {e}")
                 raise
         else:
-            logger.info("🔊 No audio available, copying video to final output...")
+            logger.info("🔊 No audio available, moving video to final output...")
             try:
-                shutil.copy2(self.output_video, self.output_file)
+                self._move_output(self.output_video, self.output_file)
                 logger.info(f"✅ Final output (video only) saved to: {self.output_file}")
             except Exception as e:
                 logger.error(f"❌ Failed to copy video to final output: {e}")
@@ -226,6 +569,12 @@ class VideoStreamer:
             self.writer.close()
             logger.info("✅ Writer closed")
 
+        if self.thumbnailer is not None:
+            self.thumbnailer.close()
+
+        if self.transform_stage is not None:
+            self.transform_stage.close()
+
     def cleanup(self):
         """Clean up resources."""
         logger.info("🧹 Cleaning up resources...")
@@ -250,24 +599,123 @@ class VideoStreamer:
             logger.info(f"🗑️  Temporary video file removed: {self.output_video}")
             self.output_video = None
 
+        self.scratch.cleanup()
+
+    def probe_audio(self):
+        """Extract the source's formats once for an audio-only job, without downloading."""
+        if self.local_source is not None:
+            logger.info("🎧 Local source, audio will be read directly from the input file")
+            return
+        ydl_opts = {
+            "format": f"{self.audio_stream_quality}",
+            "quiet": True,
+            "no_warnings": True,
+        }
+        with YoutubeDL(ydl_opts) as ydl:
+            self.audio_metadata = ydl.extract_info(self.source_url, download=False)
+
+    def fetch_audio(self):
+        """Download the probed audio stream for an audio-only job."""
+        if self.local_source is not None:
+            return
+        self.output_audio.parent.mkdir(parents=True, exist_ok=True)
+        ydl_opts = {
+            "format": f"{self.audio_stream_quality}",
+            "quiet": True,
+            "no_warnings": True,
+            "outtmpl": self.output_audio.as_posix(),
+        }
+        logger.info(f"🎧 Downloading audio to: {self.output_audio}")
+        # downloads from the probed info, so the source is not extracted a second time
+        with YoutubeDL(ydl_opts) as ydl:
+            ydl.process_ie_result(self.audio_metadata, download=True)
+
+    def transcode_audio(self):
+        """Write the fetched audio to the final output with `AUDIO_CODEC` (`copy` remuxes)."""
+        audio_input = self.local_source if self.local_source is not None else self.output_audio
+        encoder = AUDIO_ENCODERS.get(self.audio_codec, self.audio_codec)
+        logger.info(f"🔊 Writing audio with `{encoder}` to: {self.output_file}")
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # WriteGear is only used to run FFmpeg here, no frames are ever written
+            self.writer = WriteGear(
+                output=self.output_file.as_posix(),
+                compression_mode=True,
+                logging=self.verbose,
+            )
+            self.writer.execute_ffmpeg_cmd(
+                [
+                    "-y",
+                    "-i",
+                    audio_input.as_posix(),
+                    "-vn",
+                    "-map",
+                    "0:a:0",
+                    "-c:a",
+                    encoder,
+                    self.output_file.as_posix(),
+                ]
+            )
+            logger.info(f"✅ Final output (audio only) saved to: {self.output_file}")
+        except Exception as e:
+            logger.error(f"❌ Failed to write audio output: {e}")
+            raise
+
+    def _phase(self, name):
+        """Return a profiling span for a `run()` phase, or a no-op when disabled."""
+        self.phase = name
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name)
+
     def run(self):
         """Main execution method."""
         logger.info("=" * 60)
         logger.info("🎥 VidGear - Video Streamer and Writer")
         logger.info("=" * 60)
 
+        if self.profile:
+            logger.info(f"📈 Profiling enabled ({self.profile_interval * 1000:g} ms interval)")
+            self.profiler = Profiler(self.output_file, self.profile_interval).start()
+
         try:
-            self.setup_stream()
-            self.download_audio()
-            self.setup_writer()
-            self.process_stream()
-            self.stop()  # Ensure everything is stopped before combining
-            self.combine_audio_video()
+            if self.job_mode == "audio-only":
+                # no stream, frames or mux: fetch the audio and encode it once
+                with self._phase("probe_audio"):
+                    self.probe_audio()
+                with self._phase("setup_scratch"):
+                    self.setup_scratch()
+                with self._phase("download_audio"):
+                    self.fetch_audio()
+                with self._phase("transcode_audio"):
+                    self.transcode_audio()
+            else:
+                with self._phase("setup_stream"):
+                    self.setup_stream()
+                with self._phase("setup_scratch"):
+                    self.setup_scratch()
+                with self._phase("download_audio"):
+                    self.download_audio()
+                with self._phase("setup_transforms"):
+                    self.setup_transforms()
+                with self._phase("setup_writer"):
+                    self.setup_writer()
+                with self._phase("setup_thumbnails"):
+                    self.setup_thumbnails()
+                with self._phase("process_stream"):
+                    self.process_stream()
+                with self._phase("stop"):
+                    self.stop()  # Ensure everything is stopped before combining
+                with self._phase("combine_audio_video"):
+                    self.combine_audio_video()
         except Exception as e:
             logger.error(f"❌ Fatal error: {e}")
             sys.exit(1)
         finally:
-            self.cleanup()
+            with self._phase("cleanup"):
+                self.cleanup()
+            if self.profiler is not None:
+                self.profiler.write()
 
         logger.info("=" * 60)
         logger.info("🎉 Processing completed successfully!")
@@ -280,11 +728,24 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 
-if __name__ == "__main__":
+def main():
+    """Entry point: consume `QUEUE_URL` or watch `WATCH_DIR` when set, else run one job."""
     # Register signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    if os.getenv("QUEUE_URL"):
+        QueueWorker.from_env(VideoStreamer).run()
+        return
+
+    if os.getenv("WATCH_DIR"):
+        DirectoryWatcher.from_env(VideoStreamer).run()
+        return
+
     # Run the streamer
     streamer = VideoStreamer()
     streamer.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Background poster, sprite-sheet and WebVTT generation from live frames
+
+import math
+import queue
+import threading
+import logging as log
+from pathlib import Path
+
+import cv2
+import numpy as np
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Thumbnail Generator")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+def _vtt_timestamp(seconds):
+    """Format seconds as a WebVTT `HH:MM:SS.mmm` timestamp."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+class ThumbnailGenerator:
+    """Samples frames at a fixed interval and builds a poster, sprite sheets and a WebVTT index."""
+
+    def __init__(
+        self,
+        output_file,
+        framerate,
+        interval=10.0,
+        tile_width=160,
+        columns=10,
+        rows=10,
+        poster_width=640,
+        queue_size=8,
+    ):
+        """Initialize the generator; artifacts are written next to `output_file`."""
+        self.output_file = Path(output_file)
+        self.framerate = framerate if framerate else 30
+        self.interval = interval
+        self.sample_every = max(1, int(round(interval * self.framerate)))
+        self.tile_width = tile_width
+        self.columns = max(1, columns)
+        self.rows = max(1, rows)
+        self.poster_width = poster_width
+        stem = self.output_file.stem
+        self.poster_file = self.output_file.with_name(f"{stem}_poster.jpg")
+        self.vtt_file = self.output_file.with_name(f"{stem}_sprite.vtt")
+        self.frame_index = 0
+        self.dropped = 0
+        self.poster = None
+        self.tiles = []  # (timestamp, tile) pairs, filled by the worker
+        self.tile_size = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+
+    def start(self):
+        """Start the background downscaling worker."""
+        self._worker = threading.Thread(
+            target=self._run, name="ThumbnailWorker", daemon=True
+        )
+        self._worker.start()
+        return self
+
+    def submit(self, frame):
+        """Offer a frame from the streaming loop; only every Nth frame is sampled."""
+        index = self.frame_index
+        self.frame_index += 1
+        if index % self.sample_every:
+            return
+        try:
+            # copy since sources like the mosaic reuse one frame buffer;
+            # never block the streaming loop, drop the sample instead
+            self._queue.put_nowait((index / self.framerate, frame.copy()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Worker loop: downscale sampled frames until the sentinel arrives."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            timestamp, frame = item
+            try:
+                if self.poster is None:
+                    self.poster = self._downscale(frame, self.poster_width)
+                if self.tile_size is None:
+                    tile = self._downscale(frame, self.tile_width)
+                    self.tile_size = (tile.shape[1], tile.shape[0])
+                else:
+                    tile = cv2.resize(frame, self.tile_size, interpolation=cv2.INTER_AREA)
+                self.tiles.append((timestamp, tile))
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to downscale frame at {timestamp:.2f}s: {e}")
+
+    @staticmethod
+    def _downscale(frame, width):
+        """Downscale a frame to `width`, keeping aspect ratio and an even height."""
+        src_height, src_width = frame.shape[:2]
+        if width >= src_width:
+            return frame.copy()
+        height = max(2, int(round(src_height * width / src_width / 2)) * 2)
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    def close(self):
+        """Drain pending samples and stop the worker."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+
+    def _sheet_file(self, index, total):
+        """Return the sprite sheet path for `index` out of `total` sheets."""
+        stem = self.output_file.stem
+        if total == 1:
+            return self.output_file.with_name(f"{stem}_sprite.jpg")
+        return self.output_file.with_name(f"{stem}_sprite_{index:03d}.jpg")
+
+    def _tile_sheet(self, tiles):
+        """Tile equally sized frames row-major into a single image."""
+        tile_width, tile_height = self.tile_size
+        count = len(tiles)
+        columns = min(count, self.columns)
+        rows = math.ceil(count / columns)
+        grid = np.zeros((rows * columns, tile_height, tile_width, 3), dtype=np.uint8)
+        np.stack(tiles, out=grid[:count])
+        return (
+            grid.reshape(rows, columns, tile_height, tile_width, 3)
+            .swapaxes(1, 2)
+            .reshape(rows * tile_height, columns * tile_width, 3)
+        )
+
+    def write(self):
+        """Write the poster, sprite sheet(s) and WebVTT index; returns written paths."""
+        self.close()
+        if not self.tiles:
+            logger.warning("⚠️  No frames were sampled, skipping thumbnails")
+            return []
+        if self.dropped:
+            logger.warning(f"⚠️  {self.dropped} thumbnail samples dropped (worker lagging)")
+
+        written = []
+        cv2.imwrite(self.poster_file.as_posix(), self.poster)
+        written.append(self.poster_file)
+
+        tile_width, tile_height = self.tile_size
+        per_sheet = self.columns * self.rows
+        total_sheets = math.ceil(len(self.tiles) / per_sheet)
+        duration = self.frame_index / self.framerate
+        cues = ["WEBVTT", ""]
+        for sheet_index in range(total_sheets):
+            chunk = self.tiles[sheet_index * per_sheet : (sheet_index + 1) * per_sheet]
+            sheet_file = self._sheet_file(sheet_index, total_sheets)
+            cv2.imwrite(sheet_file.as_posix(), self._tile_sheet([t for _, t in chunk]))
+            written.append(sheet_file)
+            for position, (start, _) in enumerate(chunk):
+                index = sheet_index * per_sheet + position
+                if index + 1 < len(self.tiles):
+                    end = self.tiles[index + 1][0]
+                else:
+                    end = max(duration, start + 1 / self.framerate)
+                x = (position % self.columns) * tile_width
+                y = (position // self.columns) * tile_height
+                cues.append(f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}")
+                cues.append(f"{sheet_file.name}#xywh={x},{y},{tile_width},{tile_height}")
+                cues.append("")
+
+        self.vtt_file.write_text("\n".join(cues), encoding="utf-8")
+        written.append(self.vtt_file)
+        logger.info(
+            f"🖼️  Wrote poster, {total_sheets} sprite sheet(s) and index: {self.vtt_file}"
+        )
+        return written
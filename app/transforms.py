@@ -0,0 +1,236 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Batched, vectorized frame transforms on preallocated buffers
+
+import time
+import logging as log
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Frame Transforms")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+
+def _parallel(pool, function, count):
+    """Run `function(slice)` over `[0, count)`, one frame per task on `pool` if given."""
+    if pool is None or count < 2:
+        function(slice(0, count))
+        return
+    list(pool.map(function, [slice(index, index + 1) for index in range(count)]))
+
+
+class Crop:
+    """Crops a `width`x`height` region at `x`,`y` as a zero-copy view."""
+
+    def __init__(self, x, y, width, height):
+        self.x, self.y, self.width, self.height = x, y, width, height
+
+    def configure(self, shape, batch_size):
+        if self.y + self.height > shape[0] or self.x + self.width > shape[1]:
+            raise ValueError(f"Crop region exceeds {shape[1]}x{shape[0]} frame")
+        return (self.height, self.width, shape[2])
+
+    def apply(self, batch, count, pool):
+        return batch[:, self.y : self.y + self.height, self.x : self.x + self.width]
+
+
+class Resize:
+    """Resizes every frame into a preallocated output batch."""
+
+    def __init__(self, width, height, interpolation=cv2.INTER_AREA):
+        self.width, self.height = width, height
+        self.interpolation = interpolation
+        self._out = None
+
+    def configure(self, shape, batch_size):
+        self._out = np.empty((batch_size, self.height, self.width, shape[2]), np.uint8)
+        return self._out.shape[1:]
+
+    def apply(self, batch, count, pool):
+        out = self._out
+
+        def resize(chunk):
+            for index in range(chunk.start, chunk.stop):
+                # OpenCV releases the GIL, so chunks run truly in parallel
+                cv2.resize(
+                    batch[index],
+                    (self.width, self.height),
+                    dst=out[index],
+                    interpolation=self.interpolation,
+                )
+
+        _parallel(pool, resize, count)
+        return out
+
+
+class ColorAdjust:
+    """Applies brightness, contrast and gamma in place through a 256-entry lookup table."""
+
+    def __init__(self, brightness=0, contrast=1.0, gamma=1.0):
+        levels = np.arange(256, dtype=np.float32)
+        levels = (levels - 128) * contrast + 128 + brightness
+        levels = np.clip(levels, 0, 255)
+        levels = 255 * (levels / 255) ** (1 / gamma)
+        self.lut = np.clip(np.rint(levels), 0, 255).astype(np.uint8)
+
+    def configure(self, shape, batch_size):
+        return shape
+
+    def apply(self, batch, count, pool):
+        _parallel(
+            pool,
+            lambda chunk: np.take(self.lut, batch[chunk], out=batch[chunk], mode="clip"),
+            count,
+        )
+        return batch
+
+
+class Watermark:
+    """Alpha-blends an overlay image in place, in 8.8 fixed point over the whole batch.
+
+    A negative `x`/`y` positions the overlay from the right/bottom edge.
+    """
+
+    def __init__(self, image, x=10, y=10, opacity=1.0):
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if image.shape[2] == 4:
+            alpha = image[:, :, 3:].astype(np.float32) / 255
+            image = image[:, :, :3]
+        else:
+            alpha = np.ones(image.shape[:2] + (1,), np.float32)
+        alpha256 = np.rint(alpha * opacity * 256).astype(np.uint16)
+        self.inverse = 256 - alpha256
+        self.premultiplied = image.astype(np.uint16) * alpha256
+        self.height, self.width = image.shape[:2]
+        self.x, self.y = x, y
+        self._scratch = None
+        self._region = None
+
+    @classmethod
+    def from_file(cls, path, x=10, y=10, opacity=1.0):
+        image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError(f"Could not read watermark image: {path}")
+        return cls(image, x, y, opacity)
+
+    def configure(self, shape, batch_size):
+        x = self.x if self.x >= 0 else shape[1] - self.width + self.x
+        y = self.y if self.y >= 0 else shape[0] - self.height + self.y
+        if x < 0 or y < 0 or x + self.width > shape[1] or y + self.height > shape[0]:
+            raise ValueError(f"Watermark does not fit in {shape[1]}x{shape[0]} frame")
+        self._region = (slice(y, y + self.height), slice(x, x + self.width))
+        self._scratch = np.empty((batch_size, self.height, self.width, 3), np.uint16)
+        return shape
+
+    def apply(self, batch, count, pool):
+        rows, columns = self._region
+
+        def blend(chunk):
+            region = batch[chunk, rows, columns]
+            scratch = self._scratch[chunk]
+            np.multiply(region, self.inverse, out=scratch)
+            scratch += self.premultiplied
+            np.right_shift(scratch, 8, out=scratch)
+            np.copyto(region, scratch, casting="unsafe")
+
+        _parallel(pool, blend, count)
+        return batch
+
+
+class FrameBatchStage:
+    """Collects frames into a preallocated batch and runs transforms over whole batches."""
+
+    def __init__(self, transforms, batch_size=8, workers=0):
+        """Initialize the stage; `workers` > 0 runs transforms on a thread pool."""
+        self.transforms = list(transforms)
+        self.batch_size = max(1, batch_size)
+        self.workers = workers
+        self.pool = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Transform")
+            if workers > 0
+            else None
+        )
+        self.frames = 0
+        self.seconds = 0.0
+        self.output_shape = None
+        self._buffer = None
+        self._fill = 0
+        self._closed = False
+
+    def _configure(self, shape):
+        """Allocate the input batch and let each transform allocate its buffers."""
+        self._buffer = np.empty((self.batch_size,) + shape, dtype=np.uint8)
+        for transform in self.transforms:
+            shape = tuple(transform.configure(shape, self.batch_size))
+        self.output_shape = shape
+
+    def push(self, frame):
+        """Add a frame; returns the transformed batch once it is full, else None."""
+        if self._buffer is None:
+            self._configure(frame.shape)
+        slot = self._buffer[self._fill]
+        if frame.shape != slot.shape:
+            # sources may switch resolution mid-stream, the encoder cannot
+            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+        else:
+            slot[...] = frame
+        self._fill += 1
+        if self._fill == self.batch_size:
+            return self._process()
+        return None
+
+    def flush(self):
+        """Transform and return any partially filled batch, or None."""
+        if not self._fill:
+            return None
+        return self._process()
+
+    def _process(self):
+        count, self._fill = self._fill, 0
+        started = time.perf_counter()
+        batch = self._buffer
+        for transform in self.transforms:
+            batch = transform.apply(batch, count, self.pool)
+        self.seconds += time.perf_counter() - started
+        self.frames += count
+        return batch[:count]
+
+    @property
+    def fps(self):
+        """Frames transformed per second of transform time."""
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    def close(self):
+        """Shut down the worker pool and report throughput once."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+        if self.frames:
+            logger.info(
+                f"🎛️  Transformed {self.frames} frames at {self.fps:.1f} FPS "
+                f"(batch {self.batch_size}, {self.workers or 'no'} workers)"
+            )
@@ -0,0 +1,345 @@
+"""
+Copyright 2025 Abhishek Thakur(@abhiTronix) <abhi.una12@gmail.com>
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Watched-directory ingestion of local video files
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+import logging as log
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from vidgear.gears.helper import logger_handler
+
+# Initialize logger
+logger = log.getLogger("Directory Watcher")
+logger.propagate = False
+logger.addHandler(logger_handler())
+logger.setLevel(log.DEBUG)
+
+DEFAULT_EXTENSIONS = ".mp4,.mkv,.mov,.avi,.webm,.ts,.flv,.m4v"
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify, reporting files closed after writing."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {path}")
+
+    def read(self, timeout):
+        """Return names of files completed within `timeout` seconds."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, _, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _signature(stat):
+    """Return the `(size, mtime)` pair that stops changing once a file is complete."""
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _Poller:
+    """Polling fallback: reports files whose size and mtime stopped changing."""
+
+    def __init__(self, path, interval):
+        self.path = Path(path)
+        self.interval = interval
+        self._last = {}
+        self._reported = set()
+
+    def read(self, timeout):
+        """Return names of files that stayed unchanged since the previous poll."""
+        time.sleep(min(timeout, self.interval))
+        current = {}
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                current[entry.name] = _signature(entry.stat())
+        stable = [
+            name
+            for name, signature in current.items()
+            if self._last.get(name) == signature and name not in self._reported
+        ]
+        self._reported.update(stable)
+        self._reported &= set(current)
+        self._last = current
+        return stable
+
+    def close(self):
+        pass
+
+
+class DirectoryWatcher:
+    """Runs a streaming job for every completed file dropped into a directory."""
+
+    def __init__(
+        self,
+        watch_dir,
+        output_dir,
+        job_factory,
+        workers=2,
+        done_dir=None,
+        failed_dir=None,
+        extensions=DEFAULT_EXTENSIONS,
+        poll_interval=2.0,
+        batch_size=10,
+        batch_interval=5.0,
+        use_inotify=True,
+    ):
+        """Initialize the watcher; `job_factory(config)` must return an object with `run()`."""
+        self.watch_dir = Path(watch_dir)
+        self.output_dir = Path(output_dir)
+        self.job_factory = job_factory
+        self.workers = max(1, workers)
+        self.done_dir = Path(done_dir) if done_dir else self.watch_dir / "done"
+        self.failed_dir = Path(failed_dir) if failed_dir else self.watch_dir / "failed"
+        self.extensions = {
+            ext.strip().lower() for ext in extensions.split(",") if ext.strip()
+        }
+        self.poll_interval = poll_interval
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self.use_inotify = use_inotify
+        self._active = set()
+        self._running = {}  # path -> job, cancelled on shutdown
+        self._pending = {}  # path -> signature of files not yet settled at startup
+        self._finished = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._last_flush = time.monotonic()
+        self._executor = None
+
+    @classmethod
+    def from_env(cls, job_factory):
+        """Create a watcher configured from `WATCH_*` environment variables."""
+        output_file = Path(os.getenv("OUTPUT_FILE", "/app/output/vidgear_output.mp4"))
+        return cls(
+            os.environ["WATCH_DIR"],
+            os.getenv("WATCH_OUTPUT_DIR", output_file.parent.as_posix()),
+            job_factory,
+            workers=int(os.getenv("WATCH_WORKERS", "2")),
+            done_dir=os.getenv("WATCH_DONE_DIR"),
+            failed_dir=os.getenv("WATCH_FAILED_DIR"),
+            extensions=os.getenv("WATCH_EXTENSIONS", DEFAULT_EXTENSIONS),
+            poll_interval=float(os.getenv("WATCH_POLL_INTERVAL", "2")),
+            batch_size=int(os.getenv("WATCH_BATCH_SIZE", "10")),
+            batch_interval=float(os.getenv("WATCH_BATCH_INTERVAL", "5")),
+            use_inotify=os.getenv("WATCH_INOTIFY", "true").lower() == "true",
+        )
+
+    def _accepts(self, path):
+        """Check if `path` is a visible video file directly inside the watched directory."""
+        return (
+            path.parent == self.watch_dir
+            and not path.name.startswith(".")
+            and path.suffix.lower() in self.extensions
+            and path.is_file()
+        )
+
+    def _open_events(self):
+        """Open an inotify watch, falling back to polling when unavailable."""
+        if self.use_inotify:
+            try:
+                events = _Inotify(self.watch_dir)
+                logger.info(f"👀 Watching {self.watch_dir} with inotify")
+                return events
+            except (OSError, AttributeError) as e:
+                logger.warning(f"⚠️  inotify unavailable ({e}), falling back to polling")
+        logger.info(f"👀 Polling {self.watch_dir} every {self.poll_interval}s")
+        return _Poller(self.watch_dir, self.poll_interval)
+
+    def job_config(self, path):
+        """Return per-job settings overriding the environment for input `path`."""
+        stem = path.stem
+        return {
+            "VIDEO_URL": path.as_posix(),
+            "OUTPUT_FILE": (self.output_dir / f"{stem}.mp4").as_posix(),
+            "OUTPUT_VIDEO": (self.output_dir / f".{stem}.video.mp4").as_posix(),
+            "OUTPUT_AUDIO": (self.output_dir / f".{stem}.audio.aac").as_posix(),
+        }
+
+    @staticmethod
+    def _output_written(config):
+        """Check that a job left a non-empty `OUTPUT_FILE` behind."""
+        output_file = Path(config["OUTPUT_FILE"])
+        return output_file.is_file() and output_file.stat().st_size > 0
+
+    def submit(self, path):
+        """Queue a job for `path` unless it is already being processed."""
+        self._pending.pop(path, None)
+        with self._lock:
+            if path in self._active:
+                return
+            self._active.add(path)
+        logger.info(f"📥 Queued: {path.name}")
+        self._executor.submit(self._process, path)
+
+    def _process(self, path):
+        """Run one job and record its outcome for the next batch move."""
+        succeeded = False
+        config = self.job_config(path)
+        try:
+            job = self.job_factory(config)
+            with self._lock:
+                self._running[path] = job
+            job.run()
+            succeeded = True
+        except SystemExit as e:
+            # VideoStreamer.run() exits with status 1 on failure
+            succeeded = e.code in (None, 0)
+        except Exception as e:
+            logger.error(f"❌ Job for {path.name} failed: {e}")
+        finally:
+            with self._lock:
+                self._running.pop(path, None)
+        if succeeded and not self._output_written(config):
+            # FFmpeg failures (e.g. a remux rejecting the input's audio) do not raise
+            logger.error(f"❌ Job for {path.name} produced no output")
+            succeeded = False
+        with self._lock:
+            if not succeeded and self._stopping.is_set():
+                # cut short by shutdown: leave the input in place for the next run
+                self._active.discard(path)
+                logger.info(f"↩️  Interrupted: {path.name} stays in {self.watch_dir}")
+                return
+            self._finished.append((path, succeeded))
+        logger.info(f"{'✅' if succeeded else '❌'} Finished: {path.name}")
+
+    def flush(self, force=False):
+        """Move finished inputs aside once a batch is full or old enough."""
+        with self._lock:
+            due = (
+                len(self._finished) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.batch_interval
+            )
+            if not self._finished or not (due or force):
+                return []
+            batch, self._finished = self._finished, []
+            self._last_flush = time.monotonic()
+        moved = []
+        for path, succeeded in batch:
+            target_dir = self.done_dir if succeeded else self.failed_dir
+            try:
+                target_dir.mkdir(parents=True, exist_ok=True)
+                target = target_dir / path.name
+                os.replace(path, target)
+                moved.append(target)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    logger.error(f"❌ Failed to move {path.name} aside: {e}")
+            finally:
+                with self._lock:
+                    self._active.discard(path)
+        logger.info(f"📦 Moved {len(moved)} finished input(s) aside")
+        return moved
+
+    def _check_pending(self):
+        """Submit files left unsettled at startup once their size and mtime stop changing.
+
+        Such files may have been closed just before the inotify watch existed, so no
+        completion event will ever arrive for them.
+        """
+        for path, last in list(self._pending.items()):
+            try:
+                signature = _signature(path.stat())
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            if signature == last:
+                self.submit(path)
+            else:
+                self._pending[path] = signature
+
+    def _cancel_running(self):
+        """Ask running jobs to stop; those exposing a `cancelled` event stop early."""
+        with self._lock:
+            self._stopping.set()
+            jobs = list(self._running.values())
+        for job in jobs:
+            cancelled = getattr(job, "cancelled", None)
+            if isinstance(cancelled, threading.Event):
+                cancelled.set()
+
+    def run(self, stop_event=None):
+        """Watch until `stop_event` is set (or forever), processing completed files."""
+        stop_event = stop_event or threading.Event()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        events = self._open_events()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="WatchJob"
+        )
+        logger.info(f"⚙️  Processing up to {self.workers} file(s) concurrently")
+        try:
+            # files already present and settled are picked up right away, the rest
+            # once they stop changing
+            settled = time.time() - self.poll_interval
+            for path in sorted(self.watch_dir.iterdir()):
+                if not self._accepts(path):
+                    continue
+                stat = path.stat()
+                if stat.st_mtime <= settled:
+                    self.submit(path)
+                else:
+                    self._pending[path] = _signature(stat)
+            while not stop_event.is_set():
+                for name in events.read(self.poll_interval):
+                    path = self.watch_dir / name
+                    if self._accepts(path):
+                        self.submit(path)
+                self._check_pending()
+                self.flush()
+        finally:
+            logger.info("🛑 Stopping watcher, cancelling running jobs...")
+            events.close()
+            self._cancel_running()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self.flush(force=True)
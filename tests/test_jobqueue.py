@@ -0,0 +1,333 @@
+"""
+Unit tests for the leased job queue and queue worker
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import pytest
+from app.jobqueue import (
+    Job,
+    QueueWorker,
+    SQLiteQueue,
+    main,
+    open_backend,
+    register_backend,
+)
+from app.streamer import VideoStreamer
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteQueue(tmp_path / "queue" / "jobs.db")
+
+
+class _FakeStreamer:
+    """VideoStreamer stand-in running `behavior(self)` as its job"""
+
+    def __init__(self, config, behavior):
+        self.config = config
+        self.behavior = behavior
+        self.frame_count = 0
+        self.phase = None
+        self.cancelled = threading.Event()
+
+    def run(self):
+        self.behavior(self)
+
+
+def _worker(backend, behavior, tmp_path, **kwargs):
+    kwargs.setdefault("lease_seconds", 5)
+    return QueueWorker(
+        backend,
+        lambda config: _FakeStreamer(config, behavior),
+        worker_id="host-a:1",
+        poll_interval=0.01,
+        output_dir=tmp_path,
+        **kwargs,
+    )
+
+
+class TestSQLiteQueue:
+    """Test claiming, leases and outcomes"""
+
+    def test_claim_in_order(self, backend):
+        """Test FIFO claims and that running jobs are not claimed twice"""
+        first = backend.enqueue({"VIDEO_URL": "a"})
+        backend.enqueue({"VIDEO_URL": "b"})
+
+        job = backend.claim("w1", 30)
+        assert job.id == first
+        assert job.config == {"VIDEO_URL": "a"}
+        assert job.attempts == 1
+        assert backend.claim("w2", 30).config == {"VIDEO_URL": "b"}
+        assert backend.claim("w3", 30) is None
+
+    def test_renew_requires_lease(self, backend):
+        """Test that only the lease holder can renew, and only before expiry"""
+        job_id = backend.enqueue({})
+        backend.claim("w1", 0.05)
+
+        assert backend.renew(job_id, "w1", 0.05, progress=10)
+        assert not backend.renew(job_id, "w2", 30)
+        time.sleep(0.1)
+        assert not backend.renew(job_id, "w1", 30)
+        assert backend.jobs()[0]["progress"] == 10
+
+    def test_expired_lease_is_requeued(self, backend):
+        """Test that another worker takes over a job whose lease expired"""
+        job_id = backend.enqueue({}, max_attempts=2)
+        backend.claim("dead", 0.01)
+        time.sleep(0.05)
+
+        job = backend.claim("alive", 30)
+        assert job.id == job_id
+        assert job.attempts == 2
+        assert not backend.complete(job_id, "dead")
+        assert backend.complete(job_id, "alive", {"frames": 5})
+        done = backend.jobs("done")[0]
+        assert done["worker"] == "alive"
+        assert done["metrics"] == {"frames": 5}
+
+    def test_attempts_exhausted(self, backend):
+        """Test that expiry and failure stop re-queuing after `max_attempts`"""
+        expiring = backend.enqueue({}, max_attempts=1)
+        backend.claim("w1", 0.01)
+        time.sleep(0.05)
+        assert backend.requeue_expired() == 1
+
+        failing = backend.enqueue({}, max_attempts=2)
+        backend.claim("w1", 30)
+        assert backend.fail(failing, "w1", "boom")
+        assert backend.jobs("queued")[0]["id"] == failing
+        backend.claim("w1", 30)
+        backend.fail(failing, "w1", "boom again")
+
+        failed = {job["id"]: job["error"] for job in backend.jobs("failed")}
+        assert failed == {expiring: "lease expired", failing: "boom again"}
+
+    def test_release_does_not_count_attempt(self, backend):
+        """Test handing a job back on shutdown"""
+        job_id = backend.enqueue({})
+        backend.claim("w1", 30)
+
+        assert backend.release(job_id, "w1")
+        assert backend.claim("w2", 30).attempts == 1
+
+    def test_concurrent_claims_are_exclusive(self, backend):
+        """Test that concurrent workers never claim the same job"""
+        for index in range(20):
+            backend.enqueue({"index": index})
+        claimed = []
+
+        def claim_all(worker):
+            while (job := backend.claim(worker, 30)) is not None:
+                claimed.append(job.id)
+
+        threads = [threading.Thread(target=claim_all, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(claimed) == 20
+        assert len(set(claimed)) == 20
+
+
+class TestBackends:
+    """Test backend selection by URL"""
+
+    def test_open_sqlite(self, tmp_path):
+        """Test `sqlite://` URLs with absolute paths"""
+        backend = open_backend(f"sqlite://{tmp_path}/jobs.db")
+
+        assert isinstance(backend, SQLiteQueue)
+        assert backend.path == tmp_path / "jobs.db"
+
+    def test_register_backend(self):
+        """Test plugging in another backend"""
+        register_backend("memory", lambda url: url)
+
+        assert open_backend("memory://queue") == "memory://queue"
+        with pytest.raises(ValueError):
+            open_backend("redis://localhost")
+
+
+class TestQueueWorker:
+    """Test running claimed jobs"""
+
+    def test_job_config_unique_paths(self, backend, tmp_path):
+        """Test default outputs and per-attempt temporaries"""
+        worker = _worker(backend, None, tmp_path)
+        config = worker.job_config(Job("abc", {"VIDEO_URL": "x"}, 2))
+
+        assert config["OUTPUT_FILE"] == (tmp_path / "abc.mp4").as_posix()
+        assert config["OUTPUT_VIDEO"] == (tmp_path / ".abc.2.video.mp4").as_posix()
+        assert config["OUTPUT_AUDIO"] == (tmp_path / ".abc.2.audio.aac").as_posix()
+
+    def test_completes_with_metrics(self, backend, tmp_path):
+        """Test that a successful job is reported done with metrics"""
+        def behavior(streamer):
+            streamer.frame_count = 42
+            (tmp_path / "job1.mp4").write_bytes(b"x" * 10)
+
+        backend.enqueue({}, job_id="job1")
+        _worker(backend, behavior, tmp_path, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "done"
+        assert job["metrics"]["frames"] == 42
+        assert job["metrics"]["output_bytes"] == 10
+        assert job["metrics"]["worker"] == "host-a:1"
+
+    def test_missing_output_fails(self, backend, tmp_path):
+        """Test that a job returning without writing its output is not done"""
+        def behavior(streamer):
+            streamer.frame_count = 42
+
+        backend.enqueue({}, max_attempts=2)
+        _worker(backend, behavior, tmp_path, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "queued"
+        assert job["error"] == "no output written"
+
+    def test_failure_is_requeued(self, backend, tmp_path):
+        """Test that `sys.exit(1)` from a job counts as a failed attempt"""
+        def behavior(streamer):
+            raise SystemExit(1)
+
+        backend.enqueue({}, max_attempts=2)
+        _worker(backend, behavior, tmp_path, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "queued"
+        assert job["error"] == "exited with status 1"
+
+    def test_renews_while_progressing(self, backend, tmp_path):
+        """Test that leases are renewed past their length while frames flow"""
+        def behavior(streamer):
+            streamer.phase = "process_stream"
+            for _ in range(15):
+                streamer.frame_count += 1
+                time.sleep(0.02)
+            Path(streamer.config["OUTPUT_FILE"]).write_bytes(b"x")
+
+        backend.enqueue({})
+        _worker(backend, behavior, tmp_path, lease_seconds=0.1, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "done"
+        assert job["progress"] > 0
+
+    def test_renew_error_is_retried(self, backend, tmp_path, monkeypatch):
+        """Test that a failing renewal is retried instead of ending the renewals"""
+        renew = backend.renew
+        calls = []
+
+        def flaky_renew(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return renew(*args, **kwargs)
+
+        monkeypatch.setattr(backend, "renew", flaky_renew)
+
+        def behavior(streamer):
+            streamer.phase = "process_stream"
+            for _ in range(15):
+                streamer.frame_count += 1
+                time.sleep(0.02)
+            Path(streamer.config["OUTPUT_FILE"]).write_bytes(b"x")
+
+        backend.enqueue({})
+        _worker(backend, behavior, tmp_path, lease_seconds=0.1, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert len(calls) > 1
+        assert job["status"] == "done"
+
+    def test_stalled_job_loses_lease(self, backend, tmp_path):
+        """Test that a stalled loop is not renewed and gets cancelled"""
+        def behavior(streamer):
+            streamer.phase = "process_stream"
+            streamer.frame_count = 1
+            time.sleep(0.25)  # stalled past the lease
+            streamer.frame_count = 2
+            streamer.cancelled.wait(1)
+
+        backend.enqueue({})
+        _worker(backend, behavior, tmp_path, lease_seconds=0.1, max_jobs=1).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "queued"
+        assert job["error"] == "cancelled"
+        assert backend.claim("host-b:1", 30).attempts == 2
+
+    def test_invalid_settings_fail_job(self, backend, tmp_path):
+        """Test that settings rejected by VideoStreamer fail the job, not the worker"""
+        bad = backend.enqueue({"JOB_MODE": "bogus"}, max_attempts=1)
+        good = backend.enqueue({})
+        worker = QueueWorker(
+            backend,
+            VideoStreamer,
+            worker_id="host-a:1",
+            poll_interval=0.01,
+            output_dir=tmp_path,
+            max_jobs=1,
+        )
+        worker.run()
+
+        failed = backend.jobs("failed")[0]
+        assert failed["id"] == bad
+        assert "Unsupported JOB_MODE" in failed["error"]
+        assert backend.jobs("queued")[0]["id"] == good
+
+    def test_shutdown_releases_job(self, backend, tmp_path):
+        """Test that a shutdown signal hands the job back immediately"""
+        def behavior(streamer):
+            raise SystemExit(0)
+
+        backend.enqueue({})
+        with pytest.raises(SystemExit):
+            _worker(backend, behavior, tmp_path).run()
+
+        job = backend.jobs()[0]
+        assert job["status"] == "queued"
+        assert job["attempts"] == 0
+
+
+class TestVideoStreamerQueue:
+    """Test queue hooks in VideoStreamer"""
+
+    def test_cancel_stops_processing(self, mock_stream, mock_writer):
+        """Test that a cancelled job fails out of the streaming loop"""
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        streamer.writer = mock_writer
+        streamer.cancelled.set()
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            streamer.process_stream()
+
+    def test_phase_is_tracked(self):
+        """Test that `run()` phases are visible to the lease keeper"""
+        streamer = VideoStreamer()
+        with streamer._phase("process_stream"):
+            assert streamer.phase == "process_stream"
+
+
+def test_cli_enqueue_and_status(tmp_path, capsys):
+    """Test the enqueue and status commands"""
+    queue_url = f"sqlite://{tmp_path}/jobs.db"
+    main(["--queue", queue_url, "enqueue", "https://youtu.be/x", "FRAME_LIMIT=10", "--id", "j1"])
+    main(["--queue", queue_url, "status"])
+
+    output = capsys.readouterr().out
+    assert output.splitlines()[0] == "j1"
+    assert "j1\tqueued\t0" in output
+    assert open_backend(queue_url).jobs()[0]["config"] == {
+        "FRAME_LIMIT": "10",
+        "VIDEO_URL": "https://youtu.be/x",
+    }
@@ -0,0 +1,200 @@
+"""
+Unit tests for low-latency live mode
+"""
+
+import threading
+import time
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from app.live import LatencyTracker, LiveStream
+from app.streamer import VideoStreamer
+
+
+class _Capture:
+    """VideoCapture stand-in returning numbered frames, optionally gated"""
+
+    def __init__(self, count, gate=None):
+        self.remaining = count
+        self.gate = gate
+        self.released = False
+
+    def read(self):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        return True, np.full((4, 4, 3), self.remaining, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+def _source(count, gate=None):
+    """Unstarted CamGear stand-in with its first frame already decoded"""
+    source = Mock()
+    source.frame = np.full((4, 4, 3), 255, dtype=np.uint8)
+    source.stream = _Capture(count, gate)
+    source.framerate = 25.0
+    source.ytv_metadata = {"fps": 30}
+    return source
+
+
+def _drain(stream):
+    frames = []
+    while (frame := stream.read()) is not None:
+        frames.append(int(frame[0, 0, 0]))
+    return frames
+
+
+class TestLiveStream:
+    """Test the shallow drop-on-lag buffer"""
+
+    def test_delivers_every_frame_when_keeping_up(self):
+        """Test that a consumer waiting on each frame loses nothing"""
+        gate = threading.Semaphore(0)
+        gate.wait = gate.acquire
+        stream = LiveStream(_source(3, gate), depth=1).start()
+
+        frames = [int(stream.read()[0, 0, 0])]
+        for _ in range(4):
+            gate.release()
+            frame = stream.read()
+            frames.append(None if frame is None else int(frame[0, 0, 0]))
+        stream.stop()
+
+        assert frames == [255, 2, 1, 0, None]
+        assert stream.dropped == 0
+
+    def test_drops_oldest_frames_on_lag(self):
+        """Test that a lagging consumer only sees the newest frames"""
+        source = _source(10)
+        stream = LiveStream(source, depth=2).start()
+        stream._thread.join(timeout=5)
+
+        assert _drain(stream) == [1, 0]
+        assert stream.frames == 11
+        assert stream.dropped == 9
+        stream.stop()
+        assert source.stream.released
+        source.stop.assert_called_once()
+
+    def test_timestamp_of_returned_frame(self):
+        """Test that `timestamp` marks when the frame was decoded"""
+        stream = LiveStream(_source(0), depth=2).start()
+        before = time.perf_counter()
+        stream.read()
+
+        assert stream.timestamp <= before
+        assert stream.framerate == 25.0
+        assert stream.ytv_metadata == {"fps": 30}
+        stream.stop()
+
+
+class TestLatencyTracker:
+    """Test latency percentiles"""
+
+    def test_percentiles(self):
+        """Test percentile summary in milliseconds"""
+        tracker = LatencyTracker()
+        for i in range(1, 101):
+            tracker.add(i / 1000)
+
+        summary = tracker.percentiles()
+
+        assert summary["p50"] == pytest.approx(50, rel=0.015)
+        assert summary["p99"] == pytest.approx(99, rel=0.015)
+        assert summary["max"] == pytest.approx(100)
+
+    def test_memory_is_bounded(self):
+        """Test that counting more frames does not grow the tracker"""
+        tracker = LatencyTracker()
+        buckets = len(tracker.counts)
+        for i in range(100_000):
+            tracker.add((i % 1000) / 1000 + 1e-6)
+        tracker.add(1000)  # past the last bucket
+
+        summary = tracker.percentiles()
+
+        assert len(tracker.counts) == buckets
+        assert tracker.count == 100_001
+        assert summary["p50"] == pytest.approx(500, rel=0.015)
+        assert summary["max"] == pytest.approx(1_000_000)
+
+    def test_record_and_empty(self):
+        """Test recording against a perf_counter timestamp"""
+        tracker = LatencyTracker()
+        assert tracker.percentiles() == {}
+
+        tracker.record(time.perf_counter() - 0.05)
+        assert tracker.count == 1
+        assert tracker.max >= 0.05
+        assert tracker.percentiles()["p50"] == pytest.approx(tracker.max * 1000, rel=0.015)
+
+
+class TestVideoStreamerLive:
+    """Test live-mode integration"""
+
+    @pytest.fixture
+    def live_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("LIVE_MODE", "true")
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "live.mp4"))
+        return tmp_path
+
+    def test_live_settings(self, live_env, monkeypatch):
+        """Test that live mode forces progressive output and unbatched transforms"""
+        monkeypatch.setenv("TRANSFORM_BATCH", "8")
+        streamer = VideoStreamer()
+
+        assert streamer.progressive_output
+        assert streamer.output_video == live_env / "live.part.mp4"
+        assert streamer.transform_batch == 1
+
+    @patch('app.streamer.CamGear')
+    def test_setup_stream_uses_live_buffer(self, mock_camgear, live_env):
+        """Test that CamGear's queue is bypassed by the live buffer"""
+        mock_camgear.return_value = _source(0)
+        streamer = VideoStreamer()
+        streamer.setup_stream()
+
+        assert mock_camgear.call_args[1]["THREADED_QUEUE_MODE"] is False
+        mock_camgear.return_value.start.assert_not_called()
+        assert isinstance(streamer.stream, LiveStream)
+        assert streamer.framerate == 30
+        streamer.stream.stop()
+
+    @patch('app.streamer.WriteGear')
+    def test_setup_writer_zerolatency(self, mock_writegear, live_env):
+        """Test zero-latency tuning, short GOPs and packet flushing"""
+        streamer = VideoStreamer({"LIVE_GOP_SECONDS": "0.5"})
+        streamer.framerate = 30
+        streamer.setup_writer()
+
+        call_kwargs = mock_writegear.call_args[1]
+        assert call_kwargs["-tune"] == "zerolatency"
+        assert call_kwargs["-preset"] == "veryfast"
+        assert call_kwargs["-g"] == 15
+        assert call_kwargs["-flush_packets"] == 1
+        assert "frag_keyframe" in call_kwargs["-movflags"]
+
+    @patch('app.streamer.YoutubeDL')
+    def test_no_audio_download(self, mock_ydl, live_env):
+        """Test that live mode never waits for an audio download"""
+        VideoStreamer().download_audio()
+
+        mock_ydl.assert_not_called()
+
+    def test_process_stream_records_latency(self, live_env, mock_writer):
+        """Test one latency sample per written frame"""
+        streamer = VideoStreamer()
+        streamer.stream = LiveStream(_source(4), depth=8).start()
+        streamer.writer = mock_writer
+        streamer.latency = LatencyTracker()
+
+        streamer.process_stream()
+        streamer.stream.stop()
+
+        assert streamer.frame_count == 5
+        assert streamer.latency.count == 5
+        assert set(streamer.latency.percentiles()) == {"p50", "p90", "p95", "p99", "max"}
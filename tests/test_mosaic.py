@@ -0,0 +1,159 @@
+"""
+Unit tests for the multi-source mosaic compositor
+"""
+
+import time
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from app.mosaic import MosaicStream, grid_layout, parse_size
+from app.streamer import VideoStreamer
+
+
+class FakeStream:
+    """Minimal CamGear stand-in returning a fixed number of solid frames"""
+
+    def __init__(self, value, count, fps=1000, size=(64, 48)):
+        self.value = value
+        self.remaining = count
+        self.ytv_metadata = {"fps": fps}
+        self.size = size
+        self.stopped = False
+
+    def read(self):
+        if self.remaining <= 0 or self.stopped:
+            return None
+        self.remaining -= 1
+        return np.full((self.size[1], self.size[0], 3), self.value, dtype=np.uint8)
+
+    def stop(self):
+        self.stopped = True
+
+
+def _drain(mosaic, limit=1000):
+    """Read composited frames until all sources ended"""
+    frames = 0
+    while frames < limit and mosaic.read() is not None:
+        frames += 1
+    return frames
+
+
+class TestLayout:
+    """Test grid layout helpers"""
+
+    @pytest.mark.parametrize(
+        "count, expected", [(1, (1, 1)), (2, (2, 1)), (4, (2, 2)), (5, (3, 2))]
+    )
+    def test_auto_layout(self, count, expected):
+        """Test automatic near-square grids"""
+        assert grid_layout(count) == expected
+
+    def test_explicit_layout(self):
+        """Test explicit `COLSxROWS` layouts"""
+        assert grid_layout(3, "3x1") == (3, 1)
+        with pytest.raises(ValueError):
+            grid_layout(4, "3x1")
+
+    def test_parse_size(self):
+        """Test `WIDTHxHEIGHT` parsing"""
+        assert parse_size("640x360") == (640, 360)
+        with pytest.raises(ValueError):
+            parse_size("0x360")
+
+
+class TestMosaicStream:
+    """Test compositing and frame-rate alignment"""
+
+    def test_tiles_sources_into_canvas(self):
+        """Test that every source lands in its own tile"""
+        streams = {"a": FakeStream(50, 3), "b": FakeStream(200, 3)}
+        mosaic = MosaicStream(
+            list(streams), streams.get, tile_size=(32, 24), framerate=1000
+        ).start()
+        time.sleep(0.05)
+        frame = mosaic.read()
+
+        assert frame.shape == (24, 64, 3)
+        assert (frame[:, :32] == 50).all()
+        assert (frame[:, 32:] == 200).all()
+        _drain(mosaic)
+        mosaic.stop()
+
+    def test_slow_source_is_repeated(self):
+        """Test that a finished or slow source keeps its last frame instead of blocking"""
+        streams = {"fast": FakeStream(10, 200), "slow": FakeStream(90, 1)}
+        mosaic = MosaicStream(
+            list(streams), streams.get, tile_size=(32, 24), framerate=1000
+        ).start()
+        frames = _drain(mosaic)
+        mosaic.stop()
+
+        assert frames > 0
+        assert mosaic.repeated[1] > 0
+        assert (mosaic.canvas[:, 32:] == 90).all()
+
+    def test_unavailable_source_stays_black(self):
+        """Test that a source failing to open does not stop the mosaic"""
+
+        def factory(url):
+            if url == "bad":
+                raise RuntimeError("offline")
+            return FakeStream(120, 2)
+
+        mosaic = MosaicStream(
+            ["good", "bad"], factory, tile_size=(32, 24), framerate=1000
+        ).start()
+        time.sleep(0.05)
+        mosaic.read()
+
+        assert mosaic.readers[1] is None
+        assert (mosaic.canvas[:, 32:] == 0).all()
+        _drain(mosaic)
+        mosaic.stop()
+
+    def test_failing_source_finishes(self):
+        """Test that a source whose read() raises ends instead of repeating forever"""
+        broken = FakeStream(70, 5)
+        broken.read = Mock(side_effect=[broken.read(), RuntimeError("decoder crashed")])
+        streams = {"ok": FakeStream(10, 3), "broken": broken}
+        mosaic = MosaicStream(
+            list(streams), streams.get, tile_size=(32, 24), framerate=1000
+        ).start()
+        frames = _drain(mosaic)
+        mosaic.stop()
+
+        assert frames < 1000
+        assert mosaic.readers[1].finished
+        assert (mosaic.canvas[:, 32:] == 70).all()
+
+    def test_all_sources_unavailable(self):
+        """Test that the mosaic fails when no source opens"""
+        factory = Mock(side_effect=RuntimeError("offline"))
+        with pytest.raises(RuntimeError):
+            MosaicStream(["a", "b"], factory).start()
+
+
+class TestVideoStreamerMosaic:
+    """Test mosaic integration with VideoStreamer"""
+
+    def test_setup_stream_uses_mosaic(self, monkeypatch):
+        """Test that `MOSAIC_URLS` switches the input to a mosaic"""
+        monkeypatch.setenv("MOSAIC_URLS", "https://a.example, https://b.example")
+        monkeypatch.setenv("MOSAIC_FPS", "25")
+        streamer = VideoStreamer()
+
+        with patch('app.streamer.MosaicStream') as mock_mosaic:
+            streamer.setup_stream()
+
+        assert mock_mosaic.call_args[0][0] == ["https://a.example", "https://b.example"]
+        assert streamer.stream == mock_mosaic.return_value.start.return_value
+        assert streamer.framerate == 25
+
+    @patch('app.streamer.YoutubeDL')
+    def test_mosaic_skips_audio(self, mock_ytdl, monkeypatch):
+        """Test that mosaic jobs never download audio"""
+        monkeypatch.setenv("MOSAIC_URLS", "https://a.example")
+        streamer = VideoStreamer()
+        streamer.download_audio()
+
+        mock_ytdl.assert_not_called()
@@ -0,0 +1,112 @@
+"""
+Unit tests for the sampling profiler and phase spans
+"""
+
+import json
+import threading
+import time
+from unittest.mock import patch
+from app.profiling import Profiler, SamplingProfiler
+from app.streamer import VideoStreamer
+
+
+def _busy_worker(stop):
+    """Spin until asked to stop"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Test stack sampling across threads"""
+
+    def test_samples_other_threads(self):
+        """Test that stacks of non-profiler threads are collected with their names"""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_worker, args=(stop,), name="Busy")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        try:
+            for _ in range(5):
+                profiler.sample()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profiler.samples == 5
+        busy = [stack for stack in profiler.counts if stack.startswith("Busy;")]
+        assert busy
+        assert any("_busy_worker (test_profiling.py:" in stack for stack in busy)
+
+    def test_background_sampling_and_write(self, tmp_path):
+        """Test the sampler thread and collapsed-stack output format"""
+        profiler = SamplingProfiler(interval=0.001).start()
+        time.sleep(0.05)
+        profiler.stop()
+        profiler.write(tmp_path / "out.folded")
+
+        lines = (tmp_path / "out.folded").read_text().splitlines()
+        assert profiler.samples > 0
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert "SamplingProfiler" not in stack
+
+
+class TestProfiler:
+    """Test phase spans and report files"""
+
+    def test_spans_and_reports(self, tmp_path):
+        """Test that spans are recorded and both reports land next to the output"""
+        profiler = Profiler(tmp_path / "job.mp4", interval=0.001).start()
+        with profiler.span("phase"):
+            time.sleep(0.01)
+        profiler.write()
+
+        report = json.loads((tmp_path / "job.profile.json").read_text())
+        assert report["spans"][0]["name"] == "phase"
+        assert report["spans"][0]["duration"] >= 0.01
+        assert (tmp_path / "job.profile.folded").exists()
+
+
+class TestVideoStreamerProfiling:
+    """Test profiling integration with VideoStreamer.run()"""
+
+    @patch('app.streamer.VideoStreamer.download_audio')
+    @patch('app.streamer.VideoStreamer.setup_stream')
+    @patch('app.streamer.VideoStreamer.setup_writer')
+    @patch('app.streamer.VideoStreamer.process_stream')
+    @patch('app.streamer.VideoStreamer.combine_audio_video')
+    def test_run_writes_profile(self, mock_combine, mock_process, mock_setup_writer,
+                                mock_setup_stream, mock_download, monkeypatch, tmp_path):
+        """Test that PROFILE=true records every run() phase"""
+        monkeypatch.setenv("PROFILE", "true")
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "job.mp4"))
+        monkeypatch.setenv("OUTPUT_VIDEO", str(tmp_path / "video.mp4"))
+        monkeypatch.setenv("OUTPUT_AUDIO", str(tmp_path / "audio.aac"))
+        streamer = VideoStreamer()
+        streamer.run()
+
+        report = json.loads((tmp_path / "job.profile.json").read_text())
+        names = [span["name"] for span in report["spans"]]
+        assert names == [
+            "setup_stream",
+            "setup_scratch",
+            "download_audio",
+            "setup_transforms",
+            "setup_writer",
+            "setup_thumbnails",
+            "process_stream",
+            "stop",
+            "combine_audio_video",
+            "cleanup",
+        ]
+
+    def test_phase_noop_when_disabled(self, monkeypatch):
+        """Test that phases cost nothing without PROFILE"""
+        monkeypatch.setenv("PROFILE", "false")
+        streamer = VideoStreamer()
+
+        with streamer._phase("anything"):
+            pass
+
+        assert streamer.profiler is None
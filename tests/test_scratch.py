@@ -0,0 +1,300 @@
+"""
+Unit tests for scratch storage placement, preflight and cleanup
+"""
+
+import errno
+import os
+import signal
+import subprocess
+import sys
+from collections import namedtuple
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+from app.scratch import ScratchSpace, estimate_bytes
+from app.streamer import VideoStreamer
+
+Usage = namedtuple("Usage", "total used free")
+MB = 1024 * 1024
+
+
+def _free(free):
+    """Patch disk usage to report `free` bytes on every filesystem"""
+    return patch("app.scratch.shutil.disk_usage", return_value=Usage(0, 0, free))
+
+
+class TestEstimateBytes:
+    """Test size estimates from yt-dlp metadata"""
+
+    def test_video_bitrate(self):
+        """Test bitrate × duration, preferring `vbr` over `tbr`"""
+        assert estimate_bytes({"duration": 10, "vbr": 800, "tbr": 1000}) == 1_000_000
+        assert estimate_bytes({"duration": 10, "tbr": 1000}) == 1_250_000
+
+    def test_video_from_selected_format(self):
+        """Test sizing the format of the selected quality, as CamGear picks it"""
+        metadata = {
+            "duration": 10,
+            "vbr": 5000,  # yt-dlp's own `best`, with audio merged in
+            "formats": [
+                {"vcodec": "none", "acodec": "opus", "abr": 128},
+                {"vcodec": "avc1", "resolution": "640x360", "vbr": 400},
+                {"vcodec": "avc1", "resolution": "1280x720", "vbr": 1600},
+                {"vcodec": "vp9", "resolution": "1280x720", "tbr": 1200},
+                {"vcodec": "vp9", "resolution": "1920x1080", "vbr": 3200},
+            ],
+        }
+
+        assert estimate_bytes(metadata, quality="720p") == 1_500_000
+        assert estimate_bytes(metadata, quality="worst") == 500_000
+        assert estimate_bytes(metadata, quality="best") == 4_000_000
+        # unavailable qualities fall back to `best`, like CamGear
+        assert estimate_bytes(metadata, quality="2160p") == 4_000_000
+        assert estimate_bytes({"duration": 10, "vbr": 800}, quality="720p") is None
+
+    def test_audio_from_formats(self):
+        """Test the best audio-only format when there is no top-level `abr`"""
+        metadata = {
+            "duration": 8,
+            "formats": [
+                {"vcodec": "none", "acodec": "opus", "abr": 64},
+                {"vcodec": "none", "acodec": "mp4a", "abr": 128},
+                {"vcodec": "avc1", "acodec": "mp4a", "tbr": 2000},
+            ],
+        }
+
+        assert estimate_bytes(metadata, "audio") == 128_000
+
+    def test_unknown(self):
+        """Test that missing duration or bitrate gives no estimate"""
+        assert estimate_bytes({"vbr": 1000}) is None
+        assert estimate_bytes({"duration": 10}) is None
+        assert estimate_bytes({"vbr": 1000}, duration=2) == 250_000
+
+
+class TestScratchSpace:
+    """Test placement, reservations and cleanup"""
+
+    def test_no_root_keeps_paths(self, tmp_path):
+        """Test that scratch storage is a no-op without a root"""
+        path = tmp_path / "video.mp4"
+
+        assert ScratchSpace().place(path, 100) == path
+
+    def test_place_in_job_directory(self, tmp_path):
+        """Test that fitting temporaries land in a per-host, per-pid directory"""
+        scratch = ScratchSpace(tmp_path / "scratch")
+        placed = scratch.place("/app/output/video.mp4", 1000)
+
+        assert placed.name == "video.mp4"
+        assert placed.parent == scratch.directory
+        assert placed.parent.name.startswith(f"{scratch._prefix()}{os.getpid()}-")
+        assert placed.parent.is_dir()
+        scratch.cleanup()
+
+    def test_fallback_when_too_large(self, tmp_path):
+        """Test fallback for unknown sizes and for sizes exceeding free space"""
+        scratch = ScratchSpace(tmp_path, margin=1.0)
+        path = Path("/app/output/video.mp4")
+
+        assert scratch.place(path, None) == path
+        with _free(10 * MB):
+            assert scratch.place(path, 20 * MB) == path
+            assert scratch.place(path, 6 * MB) != path
+            # the first placement is reserved, so a second one no longer fits
+            assert scratch.place(Path("/app/output/audio.aac"), 6 * MB).parent == path.parent
+        scratch.cleanup()
+
+    def test_reservations_shared_across_jobs(self, tmp_path):
+        """Test that concurrent jobs in one process do not count the same free space"""
+        first = ScratchSpace(tmp_path, margin=1.0)
+        second = ScratchSpace(tmp_path, margin=1.0)
+        path = Path("/app/output/video.mp4")
+
+        with _free(10 * MB):
+            assert first.place(path, 6 * MB) != path
+            assert second.place(path, 6 * MB) == path
+            first.cleanup()
+            assert second.place(path, 6 * MB) != path
+        second.cleanup()
+
+    def test_preflight(self, tmp_path):
+        """Test that requirements on one filesystem are summed before failing"""
+        scratch = ScratchSpace(margin=1.0)
+        requirements = {
+            tmp_path / "a.mp4": 6 * MB,
+            tmp_path / "b.mp4": 6 * MB,
+            tmp_path / "c.aac": None,
+        }
+
+        with _free(20 * MB):
+            scratch.preflight(requirements)
+        with _free(10 * MB), pytest.raises(OSError) as error:
+            scratch.preflight(requirements)
+        assert error.value.errno == errno.ENOSPC
+
+    def test_cleanup_is_idempotent(self, tmp_path):
+        """Test that leftovers are removed and repeated cleanups are harmless"""
+        scratch = ScratchSpace(tmp_path)
+        scratch.place("video.mp4", 10).write_bytes(b"partial")
+        directory = scratch.directory
+
+        scratch.cleanup()
+        scratch.cleanup()
+
+        assert not directory.exists()
+
+    def test_sweep_stale(self, tmp_path):
+        """Test that only directories no running job holds locked are swept"""
+        running = ScratchSpace(tmp_path)
+        running.place("video.mp4", 10)
+        # a pid-1 directory of a killed container: same name scheme, lock not held
+        dead = tmp_path / f"{running._prefix()}1-deadbeef"
+        dead.mkdir()
+        (dead / ScratchSpace.LOCK_NAME).touch()
+        unlocked = tmp_path / "vidgear-otherhost-1-cafef00d"
+        unlocked.mkdir()
+        unrelated = tmp_path / "other"
+        unrelated.mkdir()
+
+        removed = ScratchSpace(tmp_path).sweep_stale()
+
+        assert sorted(removed) == sorted([dead, unlocked])
+        assert running.directory.is_dir()
+        assert unrelated.exists()
+        running.cleanup()
+        assert ScratchSpace(tmp_path).sweep_stale() == []
+
+    def test_sweep_after_kill(self, tmp_path):
+        """Test that a job directory left by a killed process is swept"""
+        script = (
+            "from app.scratch import ScratchSpace\n"
+            f"scratch = ScratchSpace({str(tmp_path)!r})\n"
+            "scratch.place('video.mp4', 10).write_bytes(b'partial')\n"
+            "print(scratch.directory, flush=True)\n"
+            "import time; time.sleep(30)\n"
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parents[1],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        directory = Path(process.stdout.readline().strip())
+        assert ScratchSpace(tmp_path).sweep_stale() == []
+
+        process.kill()
+        process.wait(timeout=30)
+        assert ScratchSpace(tmp_path).sweep_stale() == [directory]
+
+    def test_removed_after_signal_exit(self, tmp_path):
+        """Test cleanup at exit after `signal_handler` ends the process"""
+        script = (
+            "import signal, sys, time\n"
+            "from app.scratch import ScratchSpace\n"
+            "from app.streamer import signal_handler\n"
+            "signal.signal(signal.SIGTERM, signal_handler)\n"
+            f"scratch = ScratchSpace({str(tmp_path)!r})\n"
+            "scratch.place('video.mp4', 10).write_bytes(b'partial')\n"
+            "print(scratch.directory, flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parents[1],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        directory = Path(process.stdout.readline().strip())
+        assert directory.is_dir()
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=30) == 0
+        assert not directory.exists()
+
+
+class TestVideoStreamerScratch:
+    """Test scratch placement and preflight in the streamer"""
+
+    @pytest.fixture
+    def scratch_env(self, monkeypatch, tmp_path, mock_stream):
+        monkeypatch.setenv("SCRATCH_DIR", str(tmp_path / "scratch"))
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "out" / "final.mp4"))
+        monkeypatch.setenv("OUTPUT_VIDEO", str(tmp_path / "out" / "video.mp4"))
+        monkeypatch.setenv("OUTPUT_AUDIO", str(tmp_path / "out" / "audio.aac"))
+        mock_stream.ytv_metadata = {"duration": 60, "vbr": 2000, "abr": 128}
+        return tmp_path
+
+    def test_preflight_needs_scratch_dir(self, monkeypatch):
+        """Test that preflight is opt-in unless scratch storage is configured"""
+        monkeypatch.delenv("SCRATCH_DIR", raising=False)
+        assert not VideoStreamer().scratch_preflight
+        assert VideoStreamer({"SCRATCH_PREFLIGHT": "true"}).scratch_preflight
+        assert VideoStreamer({"SCRATCH_DIR": "/scratch"}).scratch_preflight
+
+    def test_temporaries_on_scratch(self, scratch_env, mock_stream):
+        """Test that fitting temporaries move to scratch, keeping their names"""
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        streamer.setup_scratch()
+
+        assert streamer.output_video.parent == streamer.scratch.directory
+        assert streamer.output_audio.parent == streamer.scratch.directory
+        assert streamer.output_video.name == "video.mp4"
+        streamer.cleanup()
+        assert list((scratch_env / "scratch").iterdir()) == []
+
+    def test_progressive_output_stays(self, scratch_env, mock_stream, monkeypatch):
+        """Test that progressive output is not moved away from the final file"""
+        monkeypatch.setenv("PROGRESSIVE_OUTPUT", "true")
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        streamer.setup_scratch()
+
+        assert streamer.output_video.parent == scratch_env / "out"
+        streamer.scratch.cleanup()
+
+    def test_preflight_fails_early(self, scratch_env, mock_stream):
+        """Test that a job too large for any disk fails before writing"""
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        streamer.frame_limit = 300  # 10s at 30 fps
+
+        with _free(1 * MB), pytest.raises(OSError) as error:
+            streamer.setup_scratch()
+        assert error.value.errno == errno.ENOSPC
+        assert streamer.output_video.parent == scratch_env / "out"
+        streamer.scratch.cleanup()
+
+    def test_audio_only(self, scratch_env, monkeypatch):
+        """Test that audio-only jobs place and preflight the downloaded audio"""
+        monkeypatch.setenv("JOB_MODE", "audio-only")
+        streamer = VideoStreamer()
+        streamer.audio_metadata = {"duration": 60, "abr": 128}
+        streamer.setup_scratch()
+
+        assert streamer.output_audio.parent == streamer.scratch.directory
+        assert streamer.output_video.parent == scratch_env / "out"
+        streamer.scratch.cleanup()
+
+        streamer = VideoStreamer()
+        streamer.audio_metadata = {"duration": 600, "abr": 128}
+        with _free(10 * MB), pytest.raises(OSError) as error:
+            streamer.setup_scratch()
+        assert error.value.errno == errno.ENOSPC
+        streamer.scratch.cleanup()
+
+    def test_video_only_local_source(self, scratch_env, mock_stream, monkeypatch):
+        """Test that local sources are sized by file and download no audio"""
+        source = scratch_env / "clip.mp4"
+        source.write_bytes(b"x" * 1000)
+        monkeypatch.setenv("VIDEO_URL", str(source))
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        streamer.setup_scratch()
+
+        assert streamer.output_video.parent == streamer.scratch.directory
+        assert streamer.output_audio.parent == scratch_env / "out"
+        streamer.scratch.cleanup()
@@ -0,0 +1,116 @@
+"""
+Unit tests for the soak/load harness
+"""
+
+import os
+import urllib.request
+import cv2
+import numpy as np
+import pytest
+from app.soak import (
+    VideoServer,
+    find_saturation,
+    format_table,
+    process_stats,
+    write_playlists,
+)
+
+
+def _level(concurrency, aggregate_fps, realtime=2.0, failed=0):
+    """Build a minimal level result"""
+    return {
+        "concurrency": concurrency,
+        "failed": failed,
+        "aggregate_fps": aggregate_fps,
+        "median_fps": aggregate_fps / concurrency,
+        "median_realtime": realtime,
+        "cpu_percent": 100.0 * concurrency,
+        "rss_mb": 200.0 * concurrency,
+        "write_mbps": 1.5 * concurrency,
+    }
+
+
+@pytest.fixture
+def video_dir(tmp_path):
+    """Directory holding one small test video"""
+    writer = cv2.VideoWriter(
+        (tmp_path / "clip.mp4").as_posix(), cv2.VideoWriter_fourcc(*"mp4v"), 25, (64, 48)
+    )
+    for value in range(10):
+        writer.write(np.full((48, 64, 3), value, dtype=np.uint8))
+    writer.release()
+    return tmp_path
+
+
+class TestVideoServer:
+    """Test the local video server stand-in"""
+
+    def test_playlists_describe_videos(self, video_dir):
+        """Test that master playlists carry resolution and framerate for yt-dlp"""
+        playlists = write_playlists(video_dir)
+
+        assert playlists["clip.mp4"]["playlist"] == "clip.m3u8"
+        content = (video_dir / "clip.m3u8").read_text()
+        assert "RESOLUTION=64x48" in content
+        assert "FRAME-RATE=25.000" in content
+        assert content.strip().endswith("clip.mp4")
+
+    def test_range_requests(self, video_dir):
+        """Test full and partial responses"""
+        size = os.path.getsize(video_dir / "clip.mp4")
+        server = VideoServer(video_dir).start()
+        try:
+            url = f"{server.base_url}/clip.mp4"
+            with urllib.request.urlopen(url) as response:
+                assert response.status == 200
+                assert response.headers["Accept-Ranges"] == "bytes"
+                assert len(response.read()) == size
+            request = urllib.request.Request(url, headers={"Range": "bytes=10-19"})
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 206
+                assert response.headers["Content-Range"] == f"bytes 10-19/{size}"
+                assert response.read() == (video_dir / "clip.mp4").read_bytes()[10:20]
+            request = urllib.request.Request(url, headers={"Range": "bytes=-4"})
+            with urllib.request.urlopen(request) as response:
+                assert response.read() == (video_dir / "clip.mp4").read_bytes()[-4:]
+        finally:
+            server.stop()
+
+
+class TestSaturation:
+    """Test saturation point detection and reporting"""
+
+    def test_throughput_plateau(self):
+        """Test that saturation is the last level with meaningful gain"""
+        levels = [_level(1, 100), _level(2, 190), _level(4, 300), _level(8, 310)]
+
+        assert find_saturation(levels) == 4
+
+    def test_realtime_collapse(self):
+        """Test that falling below realtime ends the sustainable range"""
+        levels = [_level(1, 100), _level(2, 190, realtime=0.8)]
+
+        assert find_saturation(levels) == 1
+
+    def test_failures_and_first_level(self):
+        """Test that failed jobs count as saturation and none is found if level 1 fails"""
+        assert find_saturation([_level(1, 100), _level(2, 200, failed=1)]) == 1
+        assert find_saturation([_level(1, 100, failed=1)]) is None
+
+    def test_format_table(self):
+        """Test the text report marks the saturation row"""
+        table = format_table([_level(1, 100), _level(2, 190)], 2)
+
+        lines = table.splitlines()
+        assert "agg fps" in lines[0]
+        assert lines[-1].endswith("<- saturation")
+        assert "2.00x" in lines[-1]
+
+
+def test_process_stats_self():
+    """Test that /proc sampling reports the current process"""
+    cpu, rss, written = process_stats(os.getpid())
+
+    assert cpu > 0
+    assert rss > 0
+    assert written >= 0
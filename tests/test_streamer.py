@@ -5,8 +5,12 @@ Unit tests for VidGear Video Streamer
 import os
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from vidgear.gears.helper import dict2Args
 from app.streamer import VideoStreamer
 
+# parameters WriteGear consumes itself instead of passing to FFmpeg
+WRITEGEAR_OPTIONS = ("-input_framerate", "-disable_force_termination")
+
 
 class TestVideoStreamerInitialization:
     """Test VideoStreamer initialization"""
@@ -268,6 +272,181 @@ class TestVideoStreamerIntegration:
         mock_cleanup.assert_called_once()
 
 
+class TestVideoStreamerProgressive:
+    """Test progressive fragmented-MP4 output"""
+
+    @pytest.fixture
+    def progressive_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PROGRESSIVE_OUTPUT", "true")
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "final.mp4"))
+        monkeypatch.setenv("OUTPUT_AUDIO", str(tmp_path / "audio.aac"))
+        return tmp_path
+
+    def test_partial_path_next_to_output(self, progressive_env):
+        """Test that the video is written beside the final file"""
+        streamer = VideoStreamer()
+
+        assert streamer.output_video == progressive_env / "final.part.mp4"
+
+    @patch('app.streamer.WriteGear')
+    def test_setup_writer_fragmented(self, mock_writegear, progressive_env):
+        """Test fragmented MP4 flags and live audio muxing"""
+        (progressive_env / "audio.aac").write_bytes(b"audio")
+        streamer = VideoStreamer()
+        streamer.setup_writer()
+
+        call_kwargs = mock_writegear.call_args[1]
+        assert "frag_keyframe" in call_kwargs["-movflags"]
+        assert call_kwargs["-i"] == str(progressive_env / "audio.aac")
+        assert "1:a:0?" in call_kwargs["-clones"]
+        # output options must come after the audio input in the FFmpeg command
+        args = dict2Args(
+            {k: v for k, v in call_kwargs.items() if k not in WRITEGEAR_OPTIONS}
+        )
+        assert args.index("-i") < args.index("-movflags")
+        assert args.index("-i") < args.index("-c:a")
+
+    @patch('app.streamer.WriteGear')
+    def test_setup_writer_fragmented_no_audio(self, mock_writegear, progressive_env):
+        """Test that no audio input is added without downloaded audio"""
+        streamer = VideoStreamer()
+        streamer.setup_writer()
+
+        assert "-i" not in mock_writegear.call_args[1]
+
+    def test_combine_renames_partial(self, progressive_env, mock_writer):
+        """Test that finalizing is a rename, not a remux or copy"""
+        (progressive_env / "audio.aac").write_bytes(b"audio")
+        streamer = VideoStreamer()
+        streamer.writer = mock_writer
+        streamer.output_video.write_bytes(b"video")
+
+        streamer.combine_audio_video()
+
+        mock_writer.execute_ffmpeg_cmd.assert_not_called()
+        assert (progressive_env / "final.mp4").read_bytes() == b"video"
+        assert not streamer.output_video.exists()
+
+
+class TestVideoStreamerMoveOutput:
+    """Test moving video-only output into place"""
+
+    def test_move_renames(self, tmp_path):
+        """Test that a same-filesystem move is a rename"""
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+
+        VideoStreamer._move_output(source, tmp_path / "final.mp4")
+
+        assert (tmp_path / "final.mp4").read_bytes() == b"video"
+        assert not source.exists()
+
+    @patch('app.streamer.os.replace')
+    def test_move_copies_across_devices(self, mock_replace, tmp_path):
+        """Test the copy fallback for cross-device moves"""
+        import errno
+
+        mock_replace.side_effect = OSError(errno.EXDEV, "cross-device link")
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+
+        VideoStreamer._move_output(source, tmp_path / "final.mp4")
+
+        assert (tmp_path / "final.mp4").read_bytes() == b"video"
+
+
+class TestVideoStreamerJobModes:
+    """Test audio-only and video-only job modes"""
+
+    def test_invalid_mode(self, monkeypatch):
+        """Test that unknown job modes are rejected"""
+        monkeypatch.setenv("JOB_MODE", "subtitles")
+
+        with pytest.raises(ValueError):
+            VideoStreamer()
+
+    @patch('app.streamer.CamGear')
+    @patch('app.streamer.WriteGear')
+    @patch('app.streamer.YoutubeDL')
+    def test_audio_only_skips_video(self, mock_ytdl, mock_writegear, mock_camgear,
+                                    monkeypatch, tmp_path):
+        """Test a single download pass, one FFmpeg encode and no video pipeline"""
+        monkeypatch.setenv("JOB_MODE", "audio-only")
+        monkeypatch.setenv("AUDIO_CODEC", "mp3")
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "episode.mp3"))
+        monkeypatch.setenv("OUTPUT_AUDIO", str(tmp_path / "audio.tmp"))
+        ydl = mock_ytdl.return_value.__enter__.return_value
+        streamer = VideoStreamer()
+        streamer.run()
+
+        mock_camgear.assert_not_called()
+        # one extraction; the download reuses it after scratch placement
+        ydl.extract_info.assert_called_once_with(streamer.source_url, download=False)
+        ydl.process_ie_result.assert_called_once_with(
+            ydl.extract_info.return_value, download=True
+        )
+        ydl.download.assert_not_called()
+        command = mock_writegear.return_value.execute_ffmpeg_cmd.call_args[0][0]
+        assert command[command.index("-i") + 1] == str(tmp_path / "audio.tmp")
+        assert command[command.index("-c:a") + 1] == "libmp3lame"
+        assert command[-1] == str(tmp_path / "episode.mp3")
+        mock_writegear.return_value.write.assert_not_called()
+
+    @patch('app.streamer.WriteGear')
+    @patch('app.streamer.YoutubeDL')
+    def test_audio_only_local_source(self, mock_ytdl, mock_writegear, monkeypatch, tmp_path):
+        """Test that local files are encoded directly, with codec names passed through"""
+        source = tmp_path / "talk.mkv"
+        source.write_bytes(b"media")
+        monkeypatch.setenv("JOB_MODE", "audio-only")
+        monkeypatch.setenv("AUDIO_CODEC", "copy")
+        monkeypatch.setenv("VIDEO_URL", str(source))
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "talk.m4a"))
+        streamer = VideoStreamer()
+        streamer.fetch_audio()
+        streamer.transcode_audio()
+
+        mock_ytdl.assert_not_called()
+        command = mock_writegear.return_value.execute_ffmpeg_cmd.call_args[0][0]
+        assert command[command.index("-i") + 1] == str(source)
+        assert command[command.index("-c:a") + 1] == "copy"
+
+    @patch('app.streamer.YoutubeDL')
+    def test_video_only_skips_audio(self, mock_ytdl, monkeypatch, tmp_path):
+        """Test that no audio is probed, downloaded or muxed"""
+        source = tmp_path / "clip.mp4"
+        source.write_bytes(b"media")
+        monkeypatch.setenv("JOB_MODE", "video-only")
+        streamer = VideoStreamer()
+        streamer.download_audio()
+
+        mock_ytdl.assert_not_called()
+        streamer.local_source = source
+        assert streamer._audio_input() is None
+
+    @patch('app.streamer.YoutubeDL')
+    def test_has_audio_reuses_stream_metadata(self, mock_ytdl, mock_stream):
+        """Test that formats extracted by CamGear are not extracted again"""
+        streamer = VideoStreamer()
+        streamer.stream = mock_stream
+        mock_stream.ytv_metadata = {"formats": [{"audio_ext": "none"}, {"audio_ext": "m4a"}]}
+        assert streamer._has_audio()
+
+        mock_stream.ytv_metadata = {"formats": [{"audio_ext": "none"}]}
+        assert not streamer._has_audio()
+        mock_ytdl.assert_not_called()
+
+    @patch('app.streamer.YoutubeDL')
+    def test_has_audio_extracts_without_metadata(self, mock_ytdl):
+        """Test the fallback extraction when no stream metadata is available"""
+        ydl = mock_ytdl.return_value.__enter__.return_value
+        ydl.extract_info.return_value = {"formats": [{"audio_ext": "webm"}]}
+        streamer = VideoStreamer()
+
+        assert streamer._has_audio()
+        ydl.extract_info.assert_called_once()
+
+
 def test_import():
     """Test that the module can be imported"""
     from app import streamer
@@ -0,0 +1,128 @@
+"""
+Unit tests for the thumbnail and sprite-sheet generator
+"""
+
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from app.streamer import VideoStreamer
+from app.thumbnails import ThumbnailGenerator, _vtt_timestamp
+
+
+def _frame(value, width=640, height=360):
+    """Create a solid-color test frame"""
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class TestThumbnailGenerator:
+    """Test sampling, tiling and index generation"""
+
+    def test_samples_every_interval(self, tmp_path):
+        """Test that only one frame per interval is downscaled"""
+        generator = ThumbnailGenerator(tmp_path / "out.mp4", 10, interval=1.0).start()
+        for i in range(35):
+            generator.submit(_frame(i))
+        generator.close()
+
+        assert generator.frame_index == 35
+        assert [t for t, _ in generator.tiles] == [0.0, 1.0, 2.0, 3.0]
+        assert generator.tile_size == (160, 90)
+        assert generator.poster.shape == (360, 640, 3)
+
+    def test_write_sprite_and_vtt(self, tmp_path):
+        """Test sprite sheet layout and WebVTT cues"""
+        generator = ThumbnailGenerator(
+            tmp_path / "out.mp4", 10, interval=1.0, columns=2, rows=2
+        ).start()
+        for i in range(30):
+            generator.submit(_frame(i * 8))
+        written = generator.write()
+
+        sprite = tmp_path / "out_sprite.jpg"
+        assert sprite in written
+        assert (tmp_path / "out_poster.jpg").exists()
+        assert cv2.imread(sprite.as_posix()).shape == (180, 320, 3)
+
+        vtt = (tmp_path / "out_sprite.vtt").read_text().splitlines()
+        assert vtt[0] == "WEBVTT"
+        assert "00:00:00.000 --> 00:00:01.000" in vtt
+        assert "out_sprite.jpg#xywh=0,90,160,90" in vtt
+        assert "00:00:02.000 --> 00:00:03.000" in vtt
+
+    def test_write_multiple_sheets(self, tmp_path):
+        """Test that tiles overflow into numbered sheets"""
+        generator = ThumbnailGenerator(
+            tmp_path / "out.mp4", 1, interval=1.0, columns=2, rows=1
+        ).start()
+        for i in range(5):
+            generator.submit(_frame(i))
+        generator.write()
+
+        assert (tmp_path / "out_sprite_000.jpg").exists()
+        assert (tmp_path / "out_sprite_002.jpg").exists()
+        vtt = (tmp_path / "out_sprite.vtt").read_text()
+        assert "out_sprite_002.jpg#xywh=0,0,160,90" in vtt
+
+    def test_full_queue_drops_samples(self, tmp_path):
+        """Test that a lagging worker never blocks the caller"""
+        generator = ThumbnailGenerator(
+            tmp_path / "out.mp4", 1, interval=1.0, queue_size=1
+        )
+        generator.submit(_frame(0))
+        generator.submit(_frame(1))
+
+        assert generator.dropped == 1
+
+    def test_write_without_samples(self, tmp_path):
+        """Test that nothing is written when no frames were sampled"""
+        generator = ThumbnailGenerator(tmp_path / "out.mp4", 30).start()
+
+        assert generator.write() == []
+        assert not (tmp_path / "out_sprite.vtt").exists()
+
+    @pytest.mark.parametrize(
+        "seconds, expected",
+        [(0, "00:00:00.000"), (61.5, "00:01:01.500"), (3725.25, "01:02:05.250")],
+    )
+    def test_vtt_timestamp(self, seconds, expected):
+        """Test WebVTT timestamp formatting"""
+        assert _vtt_timestamp(seconds) == expected
+
+
+class TestVideoStreamerThumbnails:
+    """Test thumbnail integration with the streaming loop"""
+
+    @patch('app.streamer.VideoStreamer.download_audio')
+    def test_process_stream_feeds_thumbnailer(self, mock_download, mock_writer):
+        """Test that every written frame is offered to the thumbnailer"""
+        streamer = VideoStreamer()
+        mock_stream = Mock()
+        mock_stream.read.side_effect = [_frame(0)] * 3 + [None]
+        streamer.stream = mock_stream
+        streamer.writer = mock_writer
+        streamer.thumbnailer = Mock()
+
+        streamer.process_stream()
+
+        assert streamer.thumbnailer.submit.call_count == 3
+
+    def test_setup_thumbnails_disabled(self, monkeypatch):
+        """Test that no generator is started unless enabled"""
+        monkeypatch.setenv("THUMBNAILS", "false")
+        streamer = VideoStreamer()
+        streamer.setup_thumbnails()
+
+        assert streamer.thumbnailer is None
+
+    def test_setup_thumbnails_enabled(self, monkeypatch, tmp_path):
+        """Test that the generator is configured from the environment"""
+        monkeypatch.setenv("THUMBNAILS", "true")
+        monkeypatch.setenv("THUMBNAIL_INTERVAL", "5")
+        monkeypatch.setenv("OUTPUT_FILE", str(tmp_path / "out.mp4"))
+        streamer = VideoStreamer()
+        streamer.framerate = 24
+        streamer.setup_thumbnails()
+
+        assert streamer.thumbnailer.sample_every == 120
+        streamer.thumbnailer.close()
@@ -0,0 +1,169 @@
+"""
+Unit tests for the batched frame-transform stage
+"""
+
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from app.streamer import VideoStreamer
+from app.transforms import ColorAdjust, Crop, FrameBatchStage, Resize, Watermark
+
+
+def _frame(value, width=64, height=48):
+    """Create a solid-color test frame"""
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def _run(stage, frames):
+    """Push frames through a stage and collect copies of every output frame"""
+    outputs = []
+    for frame in frames:
+        batch = stage.push(frame)
+        if batch is not None:
+            outputs.extend(f.copy() for f in batch)
+    batch = stage.flush()
+    if batch is not None:
+        outputs.extend(f.copy() for f in batch)
+    return outputs
+
+
+class TestTransforms:
+    """Test individual transforms"""
+
+    def test_crop_is_a_view(self):
+        """Test cropping returns a view of the input batch"""
+        batch = np.arange(2 * 4 * 6 * 3, dtype=np.uint8).reshape(2, 4, 6, 3)
+        crop = Crop(1, 2, 3, 2)
+
+        assert crop.configure((4, 6, 3), 2) == (2, 3, 3)
+        out = crop.apply(batch, 2, None)
+        assert np.shares_memory(out, batch)
+        assert (out == batch[:, 2:4, 1:4]).all()
+
+    def test_crop_out_of_bounds(self):
+        """Test that an impossible crop is rejected"""
+        with pytest.raises(ValueError):
+            Crop(60, 0, 10, 10).configure((48, 64, 3), 1)
+
+    def test_color_lut(self):
+        """Test brightness, contrast and identity lookup tables"""
+        assert (ColorAdjust().lut == np.arange(256)).all()
+        assert ColorAdjust(brightness=10).lut[100] == 110
+        assert ColorAdjust(contrast=2.0).lut[138] == 148
+        assert ColorAdjust(brightness=200).lut[200] == 255
+
+    def test_watermark_blend(self):
+        """Test opaque, transparent and half-opacity overlays"""
+        overlay = np.zeros((4, 4, 4), dtype=np.uint8)
+        overlay[:, :, :3] = 200
+        overlay[:2, :, 3] = 255  # top half opaque, bottom half transparent
+        watermark = Watermark(overlay, x=-2, y=-2)
+        batch = np.full((2, 10, 10, 3), 100, dtype=np.uint8)
+        watermark.configure((10, 10, 3), 2)
+        watermark.apply(batch, 2, None)
+
+        assert (batch[:, 4:6, 4:8] == 200).all()
+        assert (batch[:, 6:8, 4:8] == 100).all()
+        assert (batch[:, :4] == 100).all()
+
+        half = Watermark(np.full((2, 2, 3), 200, np.uint8), x=0, y=0, opacity=0.5)
+        batch = np.full((1, 4, 4, 3), 100, dtype=np.uint8)
+        half.configure((4, 4, 3), 1)
+        half.apply(batch, 1, None)
+        assert batch[0, 0, 0, 0] == 150
+
+
+class TestFrameBatchStage:
+    """Test batching, buffers and threading"""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_pipeline_matches_per_frame(self, workers):
+        """Test batched output equals per-frame OpenCV processing"""
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(7)]
+        stage = FrameBatchStage(
+            [Crop(4, 4, 40, 32), Resize(20, 16), ColorAdjust(brightness=5)],
+            batch_size=3,
+            workers=workers,
+        )
+        outputs = _run(stage, frames)
+        stage.close()
+
+        assert len(outputs) == 7
+        lut = ColorAdjust(brightness=5).lut
+        for frame, output in zip(frames, outputs):
+            expected = cv2.resize(
+                np.ascontiguousarray(frame[4:36, 4:44]), (20, 16), interpolation=cv2.INTER_AREA
+            )
+            assert (output == lut[expected]).all()
+        assert stage.frames == 7
+        assert stage.output_shape == (16, 20, 3)
+
+    def test_buffers_are_reused(self):
+        """Test that batches come from the same preallocated buffer"""
+        stage = FrameBatchStage([ColorAdjust(brightness=1)], batch_size=2)
+        first = stage.push(_frame(1)) or stage.push(_frame(2))
+        second = stage.push(_frame(3)) or stage.push(_frame(4))
+
+        assert np.shares_memory(first, second)
+        assert (second[:, 0, 0, 0] == [4, 5]).all()
+
+    def test_resolution_change_is_resized(self):
+        """Test that frames of a new size are fitted to the batch buffer"""
+        stage = FrameBatchStage([], batch_size=2)
+        stage.push(_frame(10))
+        batch = stage.push(_frame(20, width=128, height=96))
+
+        assert batch.shape == (2, 48, 64, 3)
+        assert (batch[1] == 20).all()
+
+    def test_close_reports_once(self):
+        """Test throughput bookkeeping and idempotent close"""
+        stage = FrameBatchStage([ColorAdjust(contrast=1.5)], batch_size=4, workers=1)
+        _run(stage, [_frame(i) for i in range(4)])
+        stage.close()
+        stage.close()
+
+        assert stage.fps > 0
+        assert stage.pool is None
+
+
+class TestVideoStreamerTransforms:
+    """Test transform integration with the streaming loop"""
+
+    def test_setup_transforms_from_env(self, monkeypatch):
+        """Test that `TRANSFORM_*` settings build the stage in order"""
+        monkeypatch.setenv("TRANSFORM_CROP", "0,0,32,24")
+        monkeypatch.setenv("TRANSFORM_RESIZE", "16x12")
+        monkeypatch.setenv("TRANSFORM_CONTRAST", "1.2")
+        monkeypatch.setenv("TRANSFORM_BATCH", "4")
+        streamer = VideoStreamer()
+        streamer.setup_transforms()
+
+        stage = streamer.transform_stage
+        assert [type(t).__name__ for t in stage.transforms] == ["Crop", "Resize", "ColorAdjust"]
+        assert stage.batch_size == 4
+
+    def test_no_transforms_by_default(self):
+        """Test that no stage is created without settings"""
+        streamer = VideoStreamer()
+        streamer.setup_transforms()
+
+        assert streamer.transform_stage is None
+
+    @patch('app.streamer.VideoStreamer.download_audio')
+    def test_process_stream_flushes_partial_batch(self, mock_download, mock_writer):
+        """Test that every frame is written, including the last partial batch"""
+        streamer = VideoStreamer()
+        mock_stream = Mock()
+        mock_stream.read.side_effect = [_frame(i) for i in range(5)] + [None]
+        streamer.stream = mock_stream
+        streamer.writer = mock_writer
+        streamer.frame_limit = 0
+        streamer.transform_stage = FrameBatchStage([ColorAdjust(brightness=1)], batch_size=2)
+
+        streamer.process_stream()
+
+        assert streamer.frame_count == 5
+        assert mock_writer.write.call_count == 5
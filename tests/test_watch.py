@@ -0,0 +1,244 @@
+"""
+Unit tests for watched-directory ingestion
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from app.streamer import VideoStreamer
+from app.watch import DirectoryWatcher, _Inotify, _Poller
+
+
+def _wait_for(condition, timeout=5.0):
+    """Poll `condition` until it holds or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestEventSources:
+    """Test inotify and polling completion detection"""
+
+    def test_inotify_reports_closed_files(self, tmp_path):
+        """Test that a file is reported once its writer closes it"""
+        events = _Inotify(tmp_path)
+        try:
+            (tmp_path / "clip.mp4").write_bytes(b"data")
+            assert events.read(1.0) == ["clip.mp4"]
+        finally:
+            events.close()
+
+    def test_poller_waits_for_stable_files(self, tmp_path):
+        """Test that the poller reports a file only after it stopped changing"""
+        poller = _Poller(tmp_path, 0)
+        (tmp_path / "clip.mp4").write_bytes(b"data")
+
+        assert poller.read(0) == []
+        assert poller.read(0) == ["clip.mp4"]
+        assert poller.read(0) == []
+
+
+class TestDirectoryWatcher:
+    """Test job dispatch and batched moves"""
+
+    @pytest.fixture
+    def dirs(self, tmp_path):
+        watch_dir = tmp_path / "in"
+        watch_dir.mkdir()
+        return watch_dir, tmp_path / "out"
+
+    def test_job_config(self, dirs):
+        """Test per-job paths derived from the input name"""
+        watch_dir, output_dir = dirs
+        watcher = DirectoryWatcher(watch_dir, output_dir, Mock())
+        config = watcher.job_config(watch_dir / "clip.mkv")
+
+        assert config["VIDEO_URL"] == (watch_dir / "clip.mkv").as_posix()
+        assert config["OUTPUT_FILE"] == (output_dir / "clip.mp4").as_posix()
+        assert config["OUTPUT_VIDEO"] == (output_dir / ".clip.video.mp4").as_posix()
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_processes_and_moves_files(self, dirs, use_inotify):
+        """Test that completed files are processed and moved aside in batches"""
+        watch_dir, output_dir = dirs
+        (watch_dir / "early.mp4").write_bytes(b"data")
+        (watch_dir / "notes.txt").write_bytes(b"skip")
+        factory = Mock()
+
+        def run():
+            if factory.call_count > 1:
+                raise SystemExit(1)
+            (output_dir / "early.mp4").write_bytes(b"data")
+
+        factory.return_value.run.side_effect = run
+        watcher = DirectoryWatcher(
+            watch_dir,
+            output_dir,
+            factory,
+            poll_interval=0.05,
+            batch_size=2,
+            batch_interval=60,
+            use_inotify=use_inotify,
+        )
+        # make the pre-existing file count as settled
+        time.sleep(0.1)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        try:
+            assert _wait_for(lambda: factory.call_count == 1)
+            (watch_dir / "late.mp4").write_bytes(b"data")
+            assert _wait_for(
+                lambda: not (watch_dir / "early.mp4").exists()
+                and not (watch_dir / "late.mp4").exists()
+            )
+        finally:
+            stop.set()
+            thread.join()
+
+        assert factory.call_count == 2
+        assert (watch_dir / "done" / "early.mp4").exists()
+        assert (watch_dir / "failed" / "late.mp4").exists()
+        assert (watch_dir / "notes.txt").exists()
+
+    def test_unsettled_startup_file(self, dirs):
+        """Test that a file closed just before startup is processed once stable"""
+        watch_dir, output_dir = dirs
+        (watch_dir / "fresh.mp4").write_bytes(b"data")
+        factory = Mock()
+        # no inotify event will come, and the file is too recent for the startup scan
+        watcher = DirectoryWatcher(watch_dir, output_dir, factory, poll_interval=0.5)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        try:
+            assert _wait_for(lambda: factory.call_count == 1)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert factory.call_args[0][0]["VIDEO_URL"] == (watch_dir / "fresh.mp4").as_posix()
+
+    def test_shutdown_cancels_running_jobs(self, dirs):
+        """Test that shutdown cancels running jobs and leaves their inputs in place"""
+        watch_dir, output_dir = dirs
+        (watch_dir / "long.mp4").write_bytes(b"data")
+        jobs = []
+
+        def factory(config):
+            job = Mock(cancelled=threading.Event())
+
+            def run():
+                if not job.cancelled.wait(30):
+                    return
+                raise SystemExit(1)
+
+            job.run.side_effect = run
+            jobs.append(job)
+            return job
+
+        watcher = DirectoryWatcher(
+            watch_dir, output_dir, factory, poll_interval=0.05, batch_interval=0
+        )
+        time.sleep(0.1)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        assert _wait_for(lambda: watcher._running)
+        started = time.monotonic()
+        stop.set()
+        thread.join()
+
+        assert time.monotonic() - started < 5
+        assert jobs[0].cancelled.is_set()
+        assert (watch_dir / "long.mp4").exists()
+        assert not (watch_dir / "failed").exists()
+
+    def test_missing_output_fails(self, dirs):
+        """Test that a job returning without writing its output counts as failed"""
+        watch_dir, output_dir = dirs
+        output_dir.mkdir()
+        (output_dir / "empty.mp4").touch()
+        watcher = DirectoryWatcher(watch_dir, output_dir, Mock())
+
+        watcher._process(watch_dir / "missing.mp4")
+        watcher._process(watch_dir / "empty.mp4")
+
+        assert watcher._finished == [
+            (watch_dir / "missing.mp4", False),
+            (watch_dir / "empty.mp4", False),
+        ]
+
+    def test_flush_waits_for_batch(self, dirs):
+        """Test that finished inputs stay until the batch is due"""
+        watch_dir, output_dir = dirs
+        (watch_dir / "a.mp4").write_bytes(b"data")
+        watcher = DirectoryWatcher(
+            watch_dir, output_dir, Mock(), batch_size=5, batch_interval=60
+        )
+        watcher._finished.append((watch_dir / "a.mp4", True))
+
+        assert watcher.flush() == []
+        assert watcher.flush(force=True) == [watch_dir / "done" / "a.mp4"]
+
+
+class TestVideoStreamerLocalSource:
+    """Test config overrides and local file handling in VideoStreamer"""
+
+    def test_config_overrides_environment(self, test_env_vars):
+        """Test that per-job config takes precedence over the environment"""
+        streamer = VideoStreamer({"VIDEO_URL": "/nonexistent.mp4", "FRAME_LIMIT": "5"})
+
+        assert streamer.source_url == "/nonexistent.mp4"
+        assert streamer.frame_limit == 5
+        assert streamer.output_codec == test_env_vars["OUTPUT_CODEC"]
+
+    def test_local_path_detection(self, tmp_path):
+        """Test plain paths and file:// URLs resolve to local files"""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"data")
+
+        assert VideoStreamer._local_path(clip.as_posix()) == clip
+        assert VideoStreamer._local_path(clip.as_uri()) == clip
+        assert VideoStreamer._local_path("https://youtu.be/xvFZjo5PgG0") is None
+        assert VideoStreamer._local_path((tmp_path / "missing.mp4").as_posix()) is None
+
+    @patch('app.streamer.CamGear')
+    def test_setup_stream_local_file(self, mock_camgear, tmp_path):
+        """Test that local files bypass yt-dlp stream mode"""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"data")
+        mock_stream = Mock(ytv_metadata={}, framerate=25.0)
+        mock_camgear.return_value.start.return_value = mock_stream
+        streamer = VideoStreamer({"VIDEO_URL": clip.as_posix()})
+        streamer.setup_stream()
+
+        call_kwargs = mock_camgear.call_args[1]
+        assert call_kwargs["stream_mode"] is False
+        assert "STREAM_RESOLUTION" not in call_kwargs
+        assert streamer.framerate == 25.0
+
+    @patch('app.streamer.YoutubeDL')
+    def test_local_file_muxes_source_audio(self, mock_ytdl, tmp_path, mock_writer):
+        """Test that audio comes straight from the local input"""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"data")
+        streamer = VideoStreamer(
+            {
+                "VIDEO_URL": clip.as_posix(),
+                "OUTPUT_FILE": (tmp_path / "out.mp4").as_posix(),
+                "OUTPUT_AUDIO": (tmp_path / "audio.aac").as_posix(),
+            }
+        )
+        streamer.writer = mock_writer
+        streamer.download_audio()
+        streamer.combine_audio_video()
+
+        mock_ytdl.assert_not_called()
+        command = mock_writer.execute_ffmpeg_cmd.call_args[0][0]
+        assert clip.as_posix() in command
+        assert "1:a:0?" in command